@@ -11,8 +11,7 @@ from src.pages import (
     region_dec_metrics_page,
     player_overview_page,
 )
-from src.utils import dev_mode, data_helper, data_loader_new
-from src.utils.data_loader_new import safe_refresh_data
+from src.utils import dev_mode, data_helper, data_loader_new, refresh_worker
 from src.utils.dev_mode import check_offline, get_version
 from src.utils.log_util import configure_logger
 
@@ -48,9 +47,8 @@ mem_placeholder = st.empty()
 st_pages.add_page_title(pg)
 
 # --- Refresh logic ---
-if data_loader_new.is_data_stale() and not data_loader_new.is_refreshing():
-    # Trigger background refresh
-    safe_refresh_data()
+# Refreshing runs on a background worker, pages only read the latest completed snapshot
+refresh_worker.get_refresh_worker()
 
 # --- Sidebar Data Status ---
 status_icon = ":large_green_circle:"
@@ -1,5 +1,8 @@
+from typing import Iterator
+
 import pandas as pd
 import streamlit as st
+from sqlalchemy import text
 
 from src.api.db.session import get_session
 from src.utils.log_util import configure_logger
@@ -15,11 +18,18 @@ RESOURCE_HUB_TABLE = "resource_hub_metrics"
 RESOURCE_SUPPLY_TABLE = "resource_supply"
 RESOURCE_TRACKING_TABLE = "resource_tracking"
 
+# Rows per chunk when streaming large tables, this bounds the memory used during a refresh
+STREAM_CHUNK_SIZE = 20_000
+
 log = configure_logger(__name__)
 
 
 @st.cache_data(ttl='1h')
-def get_last_update() :
+def get_last_update():
+    return fetch_last_update()
+
+
+def fetch_last_update():
     log.info('Fetch fresh data -  get_last_update')
     Session = get_session()
     with Session() as session:
@@ -30,36 +40,24 @@ def get_last_update() :
         return df.updatedAt.iloc[0]
 
 
-def get_active() -> pd.DataFrame:
-    log.info('Fetch fresh data -  get_active')
-    Session = get_session()
-    with Session() as session:
-        query = f"SELECT * FROM {ACTIVE_TABLE}"
-        return pd.read_sql(query, con=session.bind)
+def get_active(since=None) -> pd.DataFrame:
+    log.info(f'Fetch fresh data -  get_active (since: {since})')
+    return get_history_rows(ACTIVE_TABLE, since)
 
 
-def get_deed() -> pd.DataFrame:
-    log.info('Fetch fresh data -  get_deed')
-    Session = get_session()
-    with Session() as session:
-        query = f"SELECT * FROM {DEED_TABLE}"
-        return pd.read_sql(query, con=session.bind)
+def get_deed_chunks(chunk_size=STREAM_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    log.info('Stream fresh data -  get_deed_chunks')
+    return iter_table_chunks(DEED_TABLE, chunk_size)
 
 
-def get_staking_detail() -> pd.DataFrame:
-    log.info('Fetch fresh data -  get_staking_detail')
-    Session = get_session()
-    with Session() as session:
-        query = f"SELECT * FROM {STAKING_DETAIL_TABLE}"
-        return pd.read_sql(query, con=session.bind)
+def get_staking_detail_chunks(chunk_size=STREAM_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    log.info('Stream fresh data -  get_staking_detail_chunks')
+    return iter_table_chunks(STAKING_DETAIL_TABLE, chunk_size)
 
 
-def get_worksite_detail() -> pd.DataFrame:
-    log.info('Fetch fresh data -  get_worksite_detail')
-    Session = get_session()
-    with Session() as session:
-        query = f"SELECT * FROM {WORKSITE_DETAIL_TABLE}"
-        return pd.read_sql(query, con=session.bind)
+def get_worksite_detail_chunks(chunk_size=STREAM_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    log.info('Stream fresh data -  get_worksite_detail_chunks')
+    return iter_table_chunks(WORKSITE_DETAIL_TABLE, chunk_size)
 
 
 def get_player_production_summary() -> pd.DataFrame:
@@ -70,25 +68,43 @@ def get_player_production_summary() -> pd.DataFrame:
         return pd.read_sql(query, con=session.bind)
 
 
-def get_resource_hub_metrics() -> pd.DataFrame:
-    log.info('Fetch fresh data -  get_resource_hub_metrics')
-    Session = get_session()
-    with Session() as session:
-        query = f"SELECT * FROM {RESOURCE_HUB_TABLE}"
-        return pd.read_sql(query, con=session.bind)
+def get_resource_hub_metrics(since=None) -> pd.DataFrame:
+    log.info(f'Fetch fresh data -  get_resource_hub_metrics (since: {since})')
+    return get_history_rows(RESOURCE_HUB_TABLE, since)
 
 
-def get_resource_supply() -> pd.DataFrame:
-    log.info('Fetch fresh data -  get_resource_supply')
-    Session = get_session()
-    with Session() as session:
-        query = f"SELECT * FROM {RESOURCE_SUPPLY_TABLE}"
-        return pd.read_sql(query, con=session.bind)
+def get_resource_supply(since=None) -> pd.DataFrame:
+    log.info(f'Fetch fresh data -  get_resource_supply (since: {since})')
+    return get_history_rows(RESOURCE_SUPPLY_TABLE, since)
+
+
+def get_resource_tracking(since=None) -> pd.DataFrame:
+    log.info(f'Fetch fresh data -  get_resource_tracking (since: {since})')
+    return get_history_rows(RESOURCE_TRACKING_TABLE, since)
+
 
+def get_history_rows(table, since=None) -> pd.DataFrame:
+    """
+    Fetch rows of an append-only history table.
 
-def get_resource_tracking() -> pd.DataFrame:
-    log.info('Fetch fresh data -  get_resource_tracking')
+    :param table: Table name, the table needs a date column.
+    :param since: Only return rows with a date on or after this value, None returns the full history.
+    """
     Session = get_session()
     with Session() as session:
-        query = f"SELECT * FROM {RESOURCE_TRACKING_TABLE}"
-        return pd.read_sql(query, con=session.bind)
+        if since is None:
+            query = text(f"SELECT * FROM {table}")
+        else:
+            query = text(f'SELECT * FROM {table} WHERE "date" >= :since')
+        return pd.read_sql(query, con=session.bind, params={'since': since})
+
+
+def iter_table_chunks(table, chunk_size=STREAM_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Stream a full table as DataFrames of at most chunk_size rows.
+    A server-side cursor is used so only one chunk is held in memory at a time.
+    """
+    Session = get_session()
+    with Session() as session:
+        connection = session.connection(execution_options={'stream_results': True, 'max_row_buffer': chunk_size})
+        yield from pd.read_sql(text(f"SELECT * FROM {table}"), con=connection, chunksize=chunk_size)
@@ -2,11 +2,25 @@ import streamlit as st
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
+# Number of pooled connections, this also bounds how many tables are fetched in parallel during a refresh
+POOL_SIZE = 4
+POOL_MAX_OVERFLOW = 2
+# A single query never runs longer than this, so a hung query cannot keep a refresh (and its lock) forever
+DEFAULT_STATEMENT_TIMEOUT_SECONDS = 15 * 60
+
 
 @st.cache_resource
 def get_engine():
     db_url = st.secrets["database"]["url"]
-    return create_engine(db_url)
+    settings = st.secrets.get("settings", {})
+    statement_timeout = settings.get("db_statement_timeout_seconds", DEFAULT_STATEMENT_TIMEOUT_SECONDS)
+    return create_engine(
+        db_url,
+        pool_size=POOL_SIZE,
+        max_overflow=POOL_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        connect_args={"options": f"-c statement_timeout={int(statement_timeout * 1000)}"},
+    )
 
 
 @st.cache_resource
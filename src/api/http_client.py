@@ -0,0 +1,144 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.utils.log_util import configure_logger
+
+log = configure_logger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+REQUEST_TIMEOUT = 30
+MIN_ATTEMPT_TIMEOUT = 1
+
+
+class TokenBucket:
+    """
+    Client side rate limit: rate requests per second, bursts up to capacity.
+    Callers reserve a token and sleep until it is theirs, so waiting callers are served in order.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self) -> float:
+        """Take a token, returns the seconds waited for it."""
+        with self._lock:
+            self._refill()
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds):
+        """Hold back every caller for seconds, after the API told us to slow down."""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.tokens, 0) - seconds * self.rate
+
+
+class ApiClient:
+    """
+    Blocking HTTP client shared by every session: a keep-alive connection pool and token bucket per host,
+    and retries with exponential backoff that stop once max_retry_time would be exceeded.
+    """
+
+    def __init__(self, rate, burst, max_retry_time, pool_size, backoff_factor=1, headers=None):
+        self.rate = rate
+        self.burst = burst
+        self.max_retry_time = max_retry_time
+        self.pool_size = pool_size
+        self.backoff_factor = backoff_factor
+        self.headers = headers or {}
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _get_host(self, address) -> tuple[requests.Session, TokenBucket]:
+        host = urlparse(address).netloc
+        with self._lock:
+            if host not in self._hosts:
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.headers.update(self.headers)
+                self._hosts[host] = (session, TokenBucket(self.rate, self.burst))
+            return self._hosts[host]
+
+    def get(self, address, params=None, timeout=REQUEST_TIMEOUT, headers=None,
+            max_retry_time=None) -> requests.Response:
+        """
+        GET with retries on connection errors and RETRY_STATUSES.
+        When the retry time is used up the last response is returned (or the last error raised).
+        :param max_retry_time: total seconds for this call (all attempts), instead of the client's max_retry_time.
+        """
+        session, bucket = self._get_host(address)
+        deadline = time.monotonic() + (self.max_retry_time if max_retry_time is None else max_retry_time)
+        attempt = 0
+        while True:
+            bucket.acquire()
+            retry_after = None
+            # An attempt never runs past the deadline
+            attempt_timeout = max(min(timeout, deadline - time.monotonic()), MIN_ATTEMPT_TIMEOUT)
+            try:
+                response = session.get(address, params=params, timeout=attempt_timeout, headers=headers)
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+                reason = f"Status: {response.status_code}"
+                retry_after = get_retry_after(response)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                response = None
+                reason = f"Error: {e}"
+                error = e
+
+            attempt += 1
+            backoff = retry_after if retry_after is not None else self.backoff_factor * (2 ** (attempt - 1))
+            if time.monotonic() + backoff > deadline:
+                log.error(f"Giving up on {address} after {attempt} attempts. {reason}")
+                if response is not None:
+                    return response
+                raise error
+
+            if response is not None and response.status_code == 429:
+                bucket.pause(backoff)
+            log.warning(f"Retry triggered for {address}. {reason}. Retry {attempt}: Backoff {backoff}s.")
+            time.sleep(backoff)
+
+
+def get_retry_after(response) -> float | None:
+    value = response.headers.get("Retry-After")
+    try:
+        return max(float(value), 0) if value is not None else None
+    except ValueError:
+        # An HTTP date instead of seconds, fall back to the backoff
+        return None
+
+
+async def as_completed_limited(calls, max_concurrency):
+    """
+    Run blocking calls (functions without arguments) in a pool of max_concurrency threads.
+    Yields (position in calls, result) as the calls finish, exceptions are returned in place of a result.
+    """
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        async def run(position, call):
+            try:
+                return position, await loop.run_in_executor(executor, call)
+            except Exception as e:
+                return position, e
+
+        for finished in asyncio.as_completed([run(position, call) for position, call in enumerate(calls)]):
+            yield await finished
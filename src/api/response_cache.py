@@ -0,0 +1,139 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from src.utils.log_util import configure_logger
+
+log = configure_logger(__name__)
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS responses (
+        key TEXT PRIMARY KEY,
+        body BLOB NOT NULL,
+        etag TEXT,
+        last_modified TEXT,
+        fetched_at REAL NOT NULL,
+        expires_at REAL NOT NULL,
+        last_access REAL NOT NULL,
+        size INTEGER NOT NULL
+    )
+"""
+
+
+class CachedResponse:
+    def __init__(self, body, etag, last_modified, fetched_at, expires_at):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+        self.expires_at = expires_at
+
+    def is_fresh(self, now=None) -> bool:
+        return (now or time.time()) < self.expires_at
+
+    def is_usable_stale(self, stale_ttl, now=None) -> bool:
+        return (now or time.time()) < self.expires_at + stale_ttl
+
+    def get_validators(self) -> dict:
+        """Headers of a conditional request, the API answers 304 when the cached body is still current."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class ResponseCache:
+    """
+    API responses stored in SQLite on the data volume, keyed by URL and params.
+    Survives restarts and is shared by every process (replica) using the same file.
+    The least recently used responses are evicted once the total size passes max_bytes.
+    """
+
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self._connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(SCHEMA)
+            connection.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+
+    @contextmanager
+    def _connect(self):
+        # A connection per operation (committed on success), sqlite connections can't be shared between threads
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    @staticmethod
+    def make_key(address, params=None) -> str:
+        return json.dumps([address, sorted((params or {}).items())], default=str)
+
+    def get(self, key) -> CachedResponse | None:
+        try:
+            with self._connect() as connection:
+                row = connection.execute(
+                    "SELECT body, etag, last_modified, fetched_at, expires_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                connection.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            return CachedResponse(*row)
+        except sqlite3.Error as e:
+            log.warning(f"Response cache read failed: {e}")
+            return None
+
+    def put(self, key, body, ttl, etag=None, last_modified=None):
+        now = time.time()
+        try:
+            with self._lock, self._connect() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, body, etag, last_modified, now, now + ttl, now, len(body))
+                )
+                self._evict(connection)
+        except sqlite3.Error as e:
+            log.warning(f"Response cache write failed: {e}")
+
+    def refresh(self, key, ttl):
+        """The API confirmed (304) the cached body is current, keep it for another ttl."""
+        now = time.time()
+        try:
+            with self._connect() as connection:
+                connection.execute(
+                    "UPDATE responses SET fetched_at = ?, expires_at = ?, last_access = ? WHERE key = ?",
+                    (now, now + ttl, now, key)
+                )
+        except sqlite3.Error as e:
+            log.warning(f"Response cache write failed: {e}")
+
+    def _evict(self, connection):
+        total = connection.execute("SELECT coalesce(sum(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Oldest access first, delete until the rest fits
+        removed = 0
+        for key, size in connection.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            removed += 1
+        log.info(f"Response cache evicted {removed} responses, {total / 1024 / 1024:.1f} MB left")
+
+    def get_stats(self) -> dict:
+        with self._connect() as connection:
+            count, total = connection.execute("SELECT count(*), coalesce(sum(size), 0) FROM responses").fetchone()
+        return {'entries': count, 'size_mb': round(total / 1024 / 1024, 2)}
@@ -1,11 +1,17 @@
+import os
+import threading
+from functools import partial
 from typing import Dict, Any, Optional
 
 import pandas as pd
 import requests
 import streamlit as st
-from requests.adapters import HTTPAdapter
 
-from src.api.logRetry import LogRetry
+from src.api.http_client import ApiClient, as_completed_limited
+from src.api.response_cache import ResponseCache
+from src.utils.singleflight import SingleFlightCache
+from src.utils.snapshot_store import make_read_only
+from src.utils.snapshot_util import DATA_BASE_DIR
 from src.utils.log_util import configure_logger
 
 # API URLs
@@ -18,43 +24,67 @@ API_URLS = {
 log = configure_logger(__name__)
 
 
-# Retry Strategy
-def configure_http_session() -> requests.Session:
-    retry_strategy = LogRetry(
-        total=11,
-        status_forcelist=[429, 500, 502, 503, 504],
+DEFAULT_REQUESTS_PER_SECOND = 10
+DEFAULT_BURST = 20
+DEFAULT_MAX_RETRY_SECONDS = 60
+# Connections kept open per host, also the number of requests a page runs at once
+MAX_CONCURRENT_REQUESTS = 20
+
+RESPONSE_CACHE_PATH = os.path.join(DATA_BASE_DIR, 'http_cache.sqlite')
+DEFAULT_RESPONSE_CACHE_MB = 256
+HOUR = 60 * 60
+# In process cache in front of the response cache, it only saves parsing the stored responses
+MEMORY_CACHE_TTL = '10m'
+
+# Deeds of a player are shared between sessions for a short while, popular accounts are fetched once
+DEFAULT_PLAYER_CACHE_SECONDS = 60
+PLAYER_CACHE_MAX_ENTRIES = 100
+
+_revalidating = set()
+_revalidating_lock = threading.Lock()
+
+
+@st.cache_resource
+def get_api_client() -> ApiClient:
+    # Shared by every session, so the rate limit holds for the whole process
+    settings = st.secrets.get("settings", {})
+    return ApiClient(
+        rate=settings.get("api_requests_per_second", DEFAULT_REQUESTS_PER_SECOND),
+        burst=settings.get("api_burst", DEFAULT_BURST),
+        max_retry_time=settings.get("api_max_retry_seconds", DEFAULT_MAX_RETRY_SECONDS),
+        pool_size=MAX_CONCURRENT_REQUESTS,
         backoff_factor=2,
-        allowed_methods=["HEAD", "GET", "OPTIONS"],
-        logger_name="SPL Retry"
+        headers={
+            "Accept-Encoding": "gzip, deflate, br, zstd",
+            "User-Agent": "BeeBalanced/1.0"
+        },
     )
-    adapter = HTTPAdapter(max_retries=retry_strategy)
-    session = requests.Session()
-    session.mount("https://", adapter)
-    session.headers.update({
-        "Accept-Encoding": "gzip, deflate, br, zstd",
-        "User-Agent": "BeeBalanced/1.0"
-    })
-    return session
 
 
-http = configure_http_session()
+@st.cache_resource
+def get_response_cache() -> ResponseCache | None:
+    settings = st.secrets.get("settings", {})
+    if not settings.get("response_cache", True):
+        return None
+    max_mb = settings.get("response_cache_max_mb", DEFAULT_RESPONSE_CACHE_MB)
+    return ResponseCache(RESPONSE_CACHE_PATH, max_mb * 1024 * 1024)
 
 
 def fetch_api_data(address: str, params: Optional[Dict[str, Any]] = None,
-                   data_key: Optional[str] = None) -> pd.DataFrame:
+                   data_key: Optional[str] = None, ttl: Optional[int] = None,
+                   timeout: Optional[float] = None) -> Any:
     """
     Generic function to fetch data from the Splinterlands API.
 
     :param address: API endpoint URL.
     :param params: Query parameters for the request.
     :param data_key: Key to extract data from JSON response (optional).
-    :return: DataFrame with requested data or empty DataFrame on failure.
+    :param ttl: Seconds the response stays fresh in the persistent response cache, None to not cache it.
+    :param timeout: Total seconds for the request including retries, None for the client's retry time.
+    :return: The (nested) JSON data, None on failure.
     """
     try:
-        response = http.get(address, params=params, timeout=30)
-        response.raise_for_status()
-
-        response_json = response.json()
+        response_json = get_json(address, params, ttl, timeout)
 
         # Handle API errors
         if isinstance(response_json, dict) and "error" in response_json:
@@ -68,7 +98,68 @@ def fetch_api_data(address: str, params: Optional[Dict[str, Any]] = None,
 
     except requests.exceptions.RequestException as e:
         log.error(f"Error fetching {address}: {e}")
-        return pd.DataFrame()
+        return None
+
+
+def get_json(address, params=None, ttl=None, timeout=None):
+    """
+    With a ttl the response cache is used: fresh responses are returned as is, responses expired less than
+    a ttl ago are returned while they are revalidated in the background, older ones are revalidated first.
+    A stored response is still returned when revalidating it fails (stale if error).
+    """
+    cache = get_response_cache() if ttl else None
+    if cache is None:
+        response = get_api_client().get(address, params=params, max_retry_time=timeout)
+        response.raise_for_status()
+        return response.json()
+
+    key = cache.make_key(address, params)
+    cached = cache.get(key)
+    if cached is not None and cached.is_fresh():
+        return cached.json()
+    if cached is not None and cached.is_usable_stale(ttl):
+        revalidate_in_background(cache, key, address, params, ttl, cached)
+        return cached.json()
+    try:
+        return revalidate(cache, key, address, params, ttl, cached, timeout)
+    except requests.exceptions.RequestException as e:
+        if cached is None:
+            raise
+        # Stale if error: an old response is better than none while the API is down
+        log.warning(f"Revalidation of {address} failed, serving the stored response: {e}")
+        return cached.json()
+
+
+def revalidate(cache, key, address, params, ttl, cached=None, timeout=None):
+    headers = cached.get_validators() if cached is not None else None
+    response = get_api_client().get(address, params=params, headers=headers, max_retry_time=timeout)
+    if response.status_code == 304 and cached is not None:
+        cache.refresh(key, ttl)
+        return cached.json()
+
+    response.raise_for_status()
+    response_json = response.json()
+    if not (isinstance(response_json, dict) and "error" in response_json):
+        cache.put(key, response.content, ttl, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+    return response_json
+
+
+def revalidate_in_background(cache, key, address, params, ttl, cached):
+    with _revalidating_lock:
+        if key in _revalidating:
+            return
+        _revalidating.add(key)
+
+    def run():
+        try:
+            revalidate(cache, key, address, params, ttl, cached)
+        except Exception as e:
+            log.warning(f"Background revalidation of {address} failed, keeping the stale response: {e}")
+        finally:
+            with _revalidating_lock:
+                _revalidating.discard(key)
+
+    threading.Thread(target=run, daemon=True).start()
 
 
 def get_nested_value(response_dict: dict, key_path: str) -> Any:
@@ -85,50 +176,113 @@ def get_nested_value(response_dict: dict, key_path: str) -> Any:
     return response_dict
 
 
-@st.cache_data(ttl="1h")
+@st.cache_data(ttl=MEMORY_CACHE_TTL)
 def get_land_resources_pools():
-    result = fetch_api_data(f'{API_URLS['land']}land/liquidity/landpools', data_key='data')
+    result = fetch_api_data(f'{API_URLS['land']}land/liquidity/landpools', data_key='data', ttl=HOUR)
     if result:
         return pd.DataFrame(result)
     return pd.DataFrame()
 
 
-@st.cache_data(ttl="1h")
+@st.cache_data(ttl=MEMORY_CACHE_TTL)
 def get_prices():
-    result = fetch_api_data(f'{API_URLS['prices']}prices')
+    result = fetch_api_data(f'{API_URLS['prices']}prices', ttl=HOUR)
     if result:
         return pd.DataFrame(result, index=[0])
     return pd.DataFrame()
 
 
+@st.cache_resource
+def get_player_land_cache() -> SingleFlightCache:
+    ttl = st.secrets.get("settings", {}).get("player_cache_seconds", DEFAULT_PLAYER_CACHE_SECONDS)
+    return SingleFlightCache(ttl, PLAYER_CACHE_MAX_ENTRIES)
+
+
 def get_land_region_details_player(player):
+    """
+    Deeds, worksite and staking details of a player. Concurrent requests for the same player share one fetch
+    and the parsed frames are cached shortly. The frames are read-only, every caller gets its own shallow copy.
+    """
+    frames = get_player_land_cache().get(player, partial(fetch_land_region_details_player, player))
+    if frames is None:
+        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+    return tuple(df.copy(deep=False) for df in frames)
+
+
+def fetch_land_region_details_player(player):
     result = fetch_api_data(f'{API_URLS['land']}land/deeds', params={"player": player}, data_key='data')
 
     if result:
-        worksite_details = pd.DataFrame(result["worksite_details"])
-        staking_details = pd.DataFrame(result["staking_details"])
-        deeds = pd.DataFrame(result["deeds"])
+        worksite_details = make_read_only(pd.DataFrame(result["worksite_details"]))
+        staking_details = make_read_only(pd.DataFrame(result["staking_details"]))
+        deeds = make_read_only(pd.DataFrame(result["deeds"]))
         return deeds, worksite_details, staking_details
-    return pd.DataFrame()
+    return None
 
 
-@st.cache_data(ttl='1h')
-def get_staked_assets(deed_uid):
-    result = fetch_api_data(f'{API_URLS['land']}land/stake/deeds/{deed_uid}/assets', data_key='data')
-    if result:
-        return result
-    return None
+@st.cache_data(ttl=MEMORY_CACHE_TTL)
+def get_staked_assets(deed_uid, timeout=None):
+    """Raises when the assets are not available: st.cache_data does not cache exceptions, the next run retries."""
+    result = fetch_api_data(f'{API_URLS['land']}land/stake/deeds/{deed_uid}/assets', data_key='data', ttl=HOUR,
+                            timeout=timeout)
+    if not result:
+        raise ValueError(f"No staked assets received for deed {deed_uid}")
+    return result
 
 
-@st.cache_data(ttl='1h')
+async def get_staked_assets_batch(deed_uids, timeout=None, on_result=None) -> dict:
+    """
+    Staked assets of many deeds, fetched concurrently. deed_uid -> assets, None when not available.
+    Each fetch gets timeout seconds (including retries) of its own.
+    on_result(deed_uid, assets) is called as each deed arrives, in the order the fetches finish.
+    """
+    calls = [partial(get_staked_assets, deed_uid, timeout) for deed_uid in deed_uids]
+    assets = {}
+    async for position, result in as_completed_limited(calls, MAX_CONCURRENT_REQUESTS):
+        deed_uid = deed_uids[position]
+        if isinstance(result, Exception):
+            log.error(f"Failed to get staked assets of {deed_uid}: {result}")
+            result = None
+        assets[deed_uid] = result
+        if on_result is not None:
+            on_result(deed_uid, result)
+    return assets
+
+
+@st.cache_data(ttl=MEMORY_CACHE_TTL)
 def get_item_prices():
-    result = fetch_api_data(f'{API_URLS['land']}market/landing', data_key='data.assets')
+    result = fetch_api_data(f'{API_URLS['land']}market/landing', data_key='data.assets', ttl=HOUR)
     if result:
         return pd.DataFrame(result)
     return pd.DataFrame()
 
 
-@st.cache_data(ttl='1h')
+@st.cache_data(ttl=MEMORY_CACHE_TTL)
+def get_item_min_prices():
+    """
+    Minimum price per detailId of the spl other items marketplace, indexed once per fetch.
+    Items without a valid price list map to None.
+    """
+    df = get_item_prices()
+    if df.empty or 'detailId' not in df.columns:
+        return {}
+
+    min_prices = {}
+    for detail_id, prices in zip(df['detailId'], df.get('prices', pd.Series(index=df.index, dtype=object))):
+        if detail_id in min_prices:
+            continue
+        try:
+            if not prices or not isinstance(prices, list) or not prices[0]:
+                min_prices[detail_id] = None
+                continue
+            min_price = prices[0].get('minPrice') if isinstance(prices[0], dict) else None
+            min_prices[detail_id] = float(min_price) if min_price is not None else None
+        except Exception as e:
+            log.error(f"Failed to get price for detailId={detail_id}: {e}")
+            min_prices[detail_id] = None
+    return min_prices
+
+
 def get_item_price(detail_id):
     """
     Safely retrieve the minimum price for a given detailId from the spl other items marketplace.
@@ -136,21 +290,10 @@ def get_item_price(detail_id):
     :param detail_id: The ID of the item to search for.
     :return: The minimum price, or None if not found or malformed.
     """
-    try:
-        df = get_item_prices()
-        row = df.loc[df['detailId'] == detail_id]
-        if row.empty:
-            log.warning(f"No item found with detailId: {detail_id}")
-            return None
-
-        prices = row.iloc[0].get('prices')
-        if not prices or not isinstance(prices, list) or not prices[0]:
-            log.warning(f"No valid price list for detailId: {detail_id}")
-            return None
-
-        min_price = prices[0].get('minPrice') if isinstance(prices[0], dict) else None
-        return float(min_price) if min_price is not None else None
-
-    except Exception as e:
-        log.error(f"Failed to get price for detailId={detail_id}: {e}")
+    min_prices = get_item_min_prices()
+    if detail_id not in min_prices:
+        log.warning(f"No item found with detailId: {detail_id}")
         return None
+    if min_prices[detail_id] is None:
+        log.warning(f"No valid price list for detailId: {detail_id}")
+    return min_prices[detail_id]
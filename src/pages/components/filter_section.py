@@ -1,7 +1,11 @@
 from enum import Enum
 
+import numpy as np
 import streamlit as st
 
+from src.utils import data_loader_new
+from src.utils.filter_index import FilterIndex, FilterResultCache
+from src.utils.player_index import PlayerIndex
 from src.utils.log_util import configure_logger
 
 
@@ -35,6 +39,14 @@ SESSION_FILTER_COLUMNS = {
 
 log = configure_logger(__name__)
 
+# Total size of the filtered row positions kept across sessions
+FILTER_CACHE_MAX_BYTES = 64 * 1024 * 1024
+FILTER_CACHE_MAX_ENTRIES = 1024
+
+PLAYER_SEARCH_KEY = "filter_player_search"
+# Matches offered by the player search, only these (and the selected players) are sent to the browser
+PLAYER_SEARCH_LIMIT = 50
+
 
 def apply_filters(df, only: list[FilterKey] | None = None):
     filters = set(only) if only is not None else set(FilterKey)
@@ -47,7 +59,7 @@ def apply_filters(df, only: list[FilterKey] | None = None):
         df = df[(df["worksite_type"].isna() | (df["worksite_type"] == ""))]
 
     if FilterKey.UNDER_CONSTRUCTION in filters and st.session_state.get(FilterKey.UNDER_CONSTRUCTION.value):
-        df = df[df["is_construction_worksite_details"].fillna(False)]
+        df = df[df[get_construction_column(df.columns)].fillna(False)]
 
     if FilterKey.HAS_PP in filters and st.session_state.get(FilterKey.HAS_PP.value):
         df = df[df["total_harvest_pp"] > 0]
@@ -55,6 +67,76 @@ def apply_filters(df, only: list[FilterKey] | None = None):
     return df
 
 
+def get_construction_column(columns):
+    # The worksite copy is only kept when it differs from the deed column
+    return "is_construction_worksite_details" if "is_construction_worksite_details" in columns else "is_construction"
+
+
+def get_filter_flags():
+    """The yes/no filters as boolean columns, the filter index stores them as masks."""
+    return {
+        FilterKey.DEVELOPED: lambda df: df["worksite_type"].isna() | (df["worksite_type"] == ""),
+        FilterKey.UNDER_CONSTRUCTION: lambda df: df[get_construction_column(df.columns)].fillna(False).astype(bool),
+        FilterKey.HAS_PP: lambda df: df["total_harvest_pp"] > 0,
+    }
+
+
+def get_filter_index(df, table) -> FilterIndex | None:
+    """Filter index of a snapshot table, shared by every session. None when df is not that (unfiltered) table."""
+    version = df.attrs.get('snapshot_version')
+    if table is None or version is None:
+        return None
+
+    def build():
+        table_df = data_loader_new.load_snapshot_table(version, table)
+        return FilterIndex(table_df, SESSION_FILTER_COLUMNS.values(), get_filter_flags())
+
+    index = data_loader_new.load_derived(version, ('filter_index', table), build)
+    return index if index.matches(df) else None
+
+
+def get_player_index(df, table) -> PlayerIndex:
+    """
+    Player index of a snapshot table shared by every session. Frames that are not a snapshot table
+    (e.g. the deeds of one player) get an index of their own.
+    """
+    version = df.attrs.get('snapshot_version')
+    if table is None or version is None:
+        return PlayerIndex(df['player'])
+
+    def build():
+        return PlayerIndex(data_loader_new.load_snapshot_table(version, table)['player'])
+
+    return data_loader_new.load_derived(version, ('player_index', table), build)
+
+
+def get_filter_state(only: list[FilterKey] | None = None):
+    """The active filters, normalized so the same selection in any order gives the same state."""
+    filters = set(only) if only is not None else set(FilterKey)
+    selections = tuple(
+        (column, tuple(sorted(st.session_state[key.value], key=str)))
+        for key, column in SESSION_FILTER_COLUMNS.items()
+        if key in filters and st.session_state.get(key.value)
+    )
+    flags = tuple(key for key in get_filter_flags() if key in filters and st.session_state.get(key.value))
+    return selections, flags
+
+
+def get_filter_mask(index, only: list[FilterKey] | None = None):
+    selections, flags = get_filter_state(only)
+    return index.mask(dict(selections), flags)
+
+
+@st.cache_resource
+def get_filter_result_cache() -> FilterResultCache:
+    return FilterResultCache(FILTER_CACHE_MAX_BYTES, FILTER_CACHE_MAX_ENTRIES)
+
+
+def get_filtered_rows(index, table, only: list[FilterKey] | None = None):
+    key = (index.version, table, get_filter_state(only))
+    return get_filter_result_cache().get_rows(key, lambda: np.flatnonzero(get_filter_mask(index, only)))
+
+
 def filter_by_session(df, session_key, column_name):
     values = st.session_state.get(session_key)
     if values:
@@ -65,68 +147,73 @@ def filter_by_session(df, session_key, column_name):
 def reset_filters():
     for key in FilterKey:
         st.session_state.pop(key.value, None)
+    st.session_state.pop(PLAYER_SEARCH_KEY, None)
 
 
 def get_valid_session_values(key, valid_options):
     """Return only the valid session values that exist in current options."""
+    valid_options = set(valid_options)
     return [v for v in st.session_state.get(key, []) if v in valid_options]
 
 
-def render_location_filters(df, only):
-    if only is None or any(k in only for k in [FilterKey.REGIONS, FilterKey.TRACTS, FilterKey.PLOTS]):
-        all_regions = df.region_uid.dropna().unique().tolist()
-        all_tracts = df.tract_number.dropna().unique().tolist()
-        all_plots = df.plot_number.dropna().unique().tolist()
+def get_filter_options(df, index, key: FilterKey, only):
+    """
+    Options of a filter and, with a filter index, the number of rows each option matches
+    combined with the other active filters (its own selection is left out).
+    """
+    column = SESSION_FILTER_COLUMNS[key]
+    if index is None or column not in index.codes:
+        return sorted(df[column].dropna().unique().tolist()), None
+
+    counts = get_facet_counts(index, column, only)
+    return index.options[column], dict(zip(index.options[column], counts.tolist()))
+
 
+def get_facet_counts(index, column, only):
+    """Rows per value of column matching the other active filters, the column's own selection is left out."""
+    selections, flags = get_filter_state(only)
+    return index.facet_counts(column, {c: values for c, values in selections if c != column}, flags)
+
+
+def render_multiselect(label, key: FilterKey, df, index, only, exclude=()):
+    options, counts = get_filter_options(df, index, key, only)
+    if exclude:
+        options = [option for option in options if option not in exclude]
+    st.multiselect(label, options=options,
+                   key=key.value,
+                   default=get_valid_session_values(key.value, options),
+                   format_func=(lambda option: f"{option} ({counts.get(option, 0):,})") if counts else str)
+
+
+def render_location_filters(df, only, index=None):
+    if only is None or any(k in only for k in [FilterKey.REGIONS, FilterKey.TRACTS, FilterKey.PLOTS]):
         with st.expander("📍 Location Filters", expanded=False):
             if only is None or FilterKey.REGIONS in only:
-                st.multiselect("Regions", options=all_regions,
-                               key="filter_regions",
-                               default=get_valid_session_values("filter_regions", all_regions))
+                render_multiselect("Regions", FilterKey.REGIONS, df, index, only)
             if only is None or FilterKey.TRACTS in only:
-                st.multiselect("Tracts", options=all_tracts,
-                               key="filter_tracts",
-                               default=get_valid_session_values("filter_tracts", all_tracts))
+                render_multiselect("Tracts", FilterKey.TRACTS, df, index, only)
             if only is None or FilterKey.PLOTS in only:
-                st.multiselect("Plots", options=all_plots,
-                               key="filter_plots",
-                               default=get_valid_session_values("filter_plots", all_plots))
+                render_multiselect("Plots", FilterKey.PLOTS, df, index, only)
 
 
-def render_attribute_filters(df, only):
+def render_attribute_filters(df, only, index=None):
     if only is None or any(k in only for k in [
         FilterKey.RARITY, FilterKey.RESOURCES, FilterKey.WORKSITES,
         FilterKey.DEED_TYPE, FilterKey.PLOT_STATUS,
         FilterKey.DEVELOPED, FilterKey.UNDER_CONSTRUCTION,
         FilterKey.HAS_PP,
     ]):
-        all_rarity = df.rarity.dropna().unique().tolist()
-        all_resources = df.token_symbol.dropna().unique().tolist()
-        all_worksites = df[df.worksite_type.notna() & (df.worksite_type != "")].worksite_type.unique().tolist()
-        all_deed_type = df.deed_type.dropna().unique().tolist()
-        all_plot_status = df.plot_status.dropna().unique().tolist()
-
         with st.expander("🔎 Attributes", expanded=False):
             if only is None or FilterKey.RARITY in only:
-                st.multiselect("Rarity", options=all_rarity,
-                               key="filter_rarity",
-                               default=get_valid_session_values("filter_rarity", all_rarity))
+                render_multiselect("Rarity", FilterKey.RARITY, df, index, only)
             if only is None or FilterKey.RESOURCES in only:
-                st.multiselect("Resources", options=all_resources,
-                               key="filter_resources",
-                               default=get_valid_session_values("filter_resources", all_resources))
+                render_multiselect("Resources", FilterKey.RESOURCES, df, index, only)
             if only is None or FilterKey.WORKSITES in only:
-                st.multiselect("Worksites", options=all_worksites,
-                               key="filter_worksites",
-                               default=get_valid_session_values("filter_worksites", all_worksites))
+                render_multiselect("Worksites", FilterKey.WORKSITES, df, index, only, exclude=("",))
             if only is None or FilterKey.DEED_TYPE in only:
-                st.multiselect("Deed Type", options=all_deed_type,
-                               key="filter_deed_type",
-                               default=get_valid_session_values("filter_deed_type", all_deed_type))
+                render_multiselect("Deed Type", FilterKey.DEED_TYPE, df, index, only)
             if only is None or FilterKey.PLOT_STATUS in only:
-                st.multiselect("Plot Status", options=all_plot_status,
-                               key="filter_plot_status",
-                               default=get_valid_session_values("filter_plot_status", all_plot_status))
+                render_multiselect("Plot Status", FilterKey.PLOT_STATUS, df, index, only)
             if only is None or FilterKey.DEVELOPED in only:
                 st.checkbox("Undeveloped", key="filter_developed",
                             value=st.session_state.get("filter_developed", False))
@@ -138,28 +225,59 @@ def render_attribute_filters(df, only):
                             value=st.session_state.get("filter_has_pp", False))
 
 
-def render_player_filters(df, only):
+def render_player_filters(df, only, index=None, player_index=None):
     if only is None or FilterKey.PLAYERS in only:
-        all_players = sorted(df.player.dropna().unique().tolist())
         with st.expander("🧑 Players", expanded=False):
             if only is None or FilterKey.PLAYERS in only:
-                st.multiselect("Players", options=all_players,
-                               key="filter_players",
-                               default=get_valid_session_values("filter_players", all_players))
-
-
-def get_page(df, only: list[FilterKey] | None = None):
-    filtered_df = df.copy()
+                render_player_search(df, only, index, player_index)
+
+
+def render_player_search(df, only, index, player_index):
+    """
+    Player picker that only offers the players matching the search (and the ones already selected),
+    instead of every player of the snapshot.
+    """
+    search = st.text_input("Search player", key=PLAYER_SEARCH_KEY, placeholder="Start of the hive name")
+    selected = [player for player in st.session_state.get(FilterKey.PLAYERS.value, [])
+                if player_index.get_name(player) is not None]
+    matches = player_index.search(search, limit=PLAYER_SEARCH_LIMIT)
+    options = list(dict.fromkeys(selected + matches))
+    if search and not matches:
+        st.caption(f"No player starting with '{search}'")
+
+    counts = None
+    if index is not None:
+        column = SESSION_FILTER_COLUMNS[FilterKey.PLAYERS]
+        facet_counts = get_facet_counts(index, column, only)
+        positions = index.values[column].get_indexer(options)
+        counts = {option: int(facet_counts[p]) if p >= 0 else 0 for option, p in zip(options, positions)}
+
+    st.multiselect("Players", options=options,
+                   key=FilterKey.PLAYERS.value,
+                   default=get_valid_session_values(FilterKey.PLAYERS.value, options),
+                   format_func=(lambda option: f"{option} ({counts.get(option, 0):,})") if counts else str)
+
+
+def get_page(df, only: list[FilterKey] | None = None, table=None, player_index=None):
+    """
+    :param table: snapshot table df was loaded from, when given the filters use the table's precomputed filter index.
+    :param player_index: player index for the player search, by default the one of table (or built from df).
+    """
+    index = get_filter_index(df, table)
+    if player_index is None and (only is None or FilterKey.PLAYERS in only):
+        player_index = get_player_index(df, table)
 
     with st.sidebar:
         st.markdown("## 🎛️ Filters")
 
-        render_location_filters(df, only)
-        render_attribute_filters(df, only)
-        render_player_filters(df, only)
+        render_location_filters(df, only, index)
+        render_attribute_filters(df, only, index)
+        render_player_filters(df, only, index, player_index)
 
         if st.button("🔄 Reset Filters"):
             reset_filters()
             st.rerun()
 
-    return apply_filters(filtered_df, only=only)
+    if index is not None:
+        return df.take(get_filtered_rows(index, table, only))
+    return apply_filters(df.copy(), only=only)
@@ -0,0 +1,57 @@
+from typing import Callable
+
+import streamlit as st
+
+from src.pages.components import filter_section
+from src.utils import snapshot_util
+
+# Replayed tab output kept across sessions, charts of large frames can be a few MB each
+TAB_CACHE_TTL = '1h'
+TAB_CACHE_MAX_ENTRIES = 64
+
+
+def get_memo_key(*extra, filtered=True) -> tuple:
+    """
+    Everything the output of a tab depends on: the snapshot, the filter state (when the page is filtered)
+    and any extra page input (e.g. the player).
+    """
+    filter_state = filter_section.get_filter_state() if filtered else None
+    return snapshot_util.get_current_version(), filter_state, extra
+
+
+def get_selected_tab(labels, key) -> str:
+    last_key = f"{key}_last"
+    # Clicking the selected tab again deselects it, keep showing the last one
+    if st.session_state.get(key) not in labels:
+        last = st.session_state.get(last_key)
+        st.session_state[key] = last if last in labels else labels[0]
+
+    selected = st.segmented_control("Tab", options=labels, key=key, label_visibility="collapsed")
+    st.session_state[last_key] = selected
+    return selected
+
+
+@st.cache_data(ttl=TAB_CACHE_TTL, max_entries=TAB_CACHE_MAX_ENTRIES, show_spinner=False)
+def replay_tab(key, label, memo_key, _builder):
+    # The elements written by the builder are recorded and replayed on a cache hit
+    _builder()
+
+
+def render_tabs(tabs: dict[str, Callable[[], None]], key, memo_key=None, cached=(), on_select=None) -> str:
+    """
+    Tabs where only the selected tab's builder runs, st.tabs runs every tab on every rerun.
+    Tabs in cached (tabs without widgets) are memoized per (memo_key, tab): going back to one replays its
+    output instead of building it again. Their builders can only write to elements they create themselves,
+    on_select(label) is called before the builder for anything outside the tab (e.g. a status message).
+    Returns the selected label.
+    """
+    labels = list(tabs)
+    selected = get_selected_tab(labels, key)
+    if on_select is not None:
+        on_select(selected)
+
+    if selected in cached and memo_key is not None:
+        replay_tab(key, selected, memo_key, tabs[selected])
+    else:
+        tabs[selected]()
+    return selected
@@ -1,6 +1,9 @@
 import streamlit as st
 
+from src.utils.sort_index import SortIndex
+
 SORT_OPTIONS = {
+    "Location (Region, Tract, Plot)": ["region_number", "tract_number", "plot_number"],
     "Region Number": "region_number",
     "Tract Number": "tract_number",
     "Plot Number": "plot_number",
@@ -9,9 +12,33 @@ SORT_OPTIONS = {
     "Percentage full/complete": "percentage_done",
 }
 SORT_KEYS = ["sort_by", "sort_ascending"]
+SORT_INDEX_KEY = "sort_index"
+
+
+def get_sort_columns(sort_option):
+    columns = SORT_OPTIONS[sort_option]
+    return columns if isinstance(columns, list) else [columns]
+
+
+def get_sortable_columns():
+    return list(dict.fromkeys(column for option in SORT_OPTIONS for column in get_sort_columns(option)))
+
+
+def get_sort_index(df) -> SortIndex:
+    """Sort index of the data (e.g. the fetched deeds of a player), kept in the session until the data changes."""
+    sort_index = st.session_state.get(SORT_INDEX_KEY)
+    if sort_index is None or not sort_index.matches(df):
+        key_column = 'deed_uid' if 'deed_uid' in df.columns else None
+        sort_index = SortIndex(df, get_sortable_columns(), key_column=key_column)
+        st.session_state[SORT_INDEX_KEY] = sort_index
+    return sort_index
 
 
-def get_sorting_section(df):
+def get_sorting_section(df, sort_index=None, rows=None):
+    """
+    :param sort_index: presorted positions of the unfiltered data df is a view of.
+    :param rows: increasing row positions of df in that data, None when df is the unfiltered data.
+    """
     with st.sidebar:
         with st.expander("## 🔽 Sorting", expanded=False):
             # Defaults
@@ -36,11 +63,14 @@ def get_sorting_section(df):
                 key="sort_ascending"
             )
 
-            sort_column = SORT_OPTIONS[selected_display]
+            sort_columns = get_sort_columns(selected_display)
             is_ascending = ascending == "Ascending"
 
-            if sort_column in df.columns:
-                df = df.sort_values(by=sort_column, ascending=is_ascending)
+            if sort_index is not None and sort_index.has_columns(sort_columns):
+                df = df.take(sort_index.sort_rows(sort_columns, is_ascending, rows))
+            elif all(column in df.columns for column in sort_columns):
+                # Columns computed per rerun (e.g. progress) are not in the index
+                df = df.sort_values(by=sort_columns, ascending=is_ascending, kind='stable')
 
             if st.button("🔄 Reset Sorting"):
                 reset_sorting()
@@ -1,6 +1,6 @@
 from src.static.icons import land_hammer_icon_url
 from src.static.static_values_enum import worksite_type_mapping, resource_icon_map
-from src.utils.resource_util import calc_costs
+from src.utils.resource_util import COST_COLUMNS
 
 production_card_style = """
 <style>
@@ -178,7 +178,8 @@ def add_production(row, include_tax):
     resource = row.get('resource_symbol', '')
 
     image_url = worksite_type_mapping.get(worksite_type)
-    cost = calc_costs(row)
+    # Added for all deeds at once with resource_util.add_costs
+    cost = row[COST_COLUMNS]
 
     hammer_icon = f'<img src="{land_hammer_icon_url}" alt="hammer" />'
     prod_icon = f'<img src="{resource_icon_map.get(resource, land_hammer_icon_url)}" alt="{resource}" />'
@@ -1,32 +1,57 @@
+from datetime import datetime, timezone
+
+import numpy as np
 import pandas as pd
 
-from src.utils.time_util import valid_date, time_until, calculate_progress
+from src.utils.time_util import parse_iso_dates, time_until_series, calculate_progress_series, round_values
+
+CONSTRUCTION_TOOLTIP = "Show the amount of time until building is finished. When finished a negative time can be shown."
+CAPACITY_TOOLTIP = ("How close this plot is to full. "
+                    "Once capacity reached 100%,"
+                    " resources no longer accumulate until they are harvested")
 
 
 def production_percentage(hours_since_last_op):
     max_hours = 7 * 24  # 7 days = 168 hours
     percent = (hours_since_last_op / max_hours) * 100
-    return min(round(percent, 2), 100.0)  # cap at 100%
-
-
-def get_progress_info(hours_since_last_op, projected_created_date, projected_end_date, boosted_pp):
-    if valid_date(projected_end_date):
-        info_str = f'Finished in: {time_until(projected_end_date)}'
-        percentage_done = calculate_progress(projected_created_date, projected_end_date)
-        tooltip = "Show the amount of time until building is finished. When finished a negative time can be shown."
-    elif boosted_pp <= 0:
-        percentage_done = 0
-        info_str = "No workers assigned"
-        tooltip = None
-    elif pd.notna(hours_since_last_op):
-        percentage_done = production_percentage(hours_since_last_op)
-        info_str = f'{percentage_done}% Capacity'
-        tooltip = ("How close this plot is to full. "
-                   "Once capacity reached 100%,"
-                   " resources no longer accumulate until they are harvested")
-    else:
-        percentage_done = 0
-        info_str = "Undeveloped"
-        tooltip = None
-
-    return pd.Series({'percentage_done': percentage_done, 'info_str': info_str, 'progress_tooltip': tooltip})
+    return np.minimum(round_values(percent, 2), 100.0)  # cap at 100%
+
+
+def get_column(df, column, default=None):
+    return df[column] if column in df.columns else pd.Series(default, index=df.index, dtype=object)
+
+
+def get_progress_info(df):
+    """percentage_done, info_str and progress_tooltip of every deed, computed per column instead of per row."""
+    now = datetime.now(timezone.utc)
+    projected_end = parse_iso_dates(get_column(df, 'projected_end'))
+    projected_created = parse_iso_dates(get_column(df, 'project_created_date'))
+    hours_since_last_op = pd.to_numeric(get_column(df, 'hours_since_last_op', 0))
+    boosted_pp = pd.to_numeric(get_column(df, 'total_harvest_pp', 0))
+
+    # Same precedence as the branches of a single deed: construction, no workers, capacity, undeveloped
+    in_construction = projected_end.notna().to_numpy()
+    no_workers = ~in_construction & (boosted_pp <= 0).to_numpy()
+    producing = ~in_construction & ~no_workers & hours_since_last_op.notna().to_numpy()
+
+    info = pd.DataFrame({
+        'percentage_done': 0.0,
+        'info_str': "Undeveloped",
+        'progress_tooltip': np.full(len(df), None, dtype=object),
+    }, index=df.index)
+    info.loc[no_workers, 'info_str'] = "No workers assigned"
+
+    if in_construction.any():
+        finished_in = time_until_series(projected_end[in_construction], now)
+        info.loc[in_construction, 'info_str'] = 'Finished in: ' + finished_in
+        info.loc[in_construction, 'percentage_done'] = calculate_progress_series(
+            projected_created[in_construction], projected_end[in_construction], now)
+        info.loc[in_construction, 'progress_tooltip'] = CONSTRUCTION_TOOLTIP
+
+    if producing.any():
+        percentage_done = production_percentage(hours_since_last_op[producing].to_numpy(dtype=float))
+        info.loc[producing, 'percentage_done'] = percentage_done
+        info.loc[producing, 'info_str'] = pd.Series(percentage_done).astype(str).to_numpy() + '% Capacity'
+        info.loc[producing, 'progress_tooltip'] = CAPACITY_TOOLTIP
+
+    return info
@@ -7,7 +7,7 @@ def add_ranking_overview(df, player):
 
     df = df[['player', 'deed_uid', 'total_harvest_pp', 'total_base_pp_after_cap', 'rewards_per_hour']].copy()
 
-    df = df.groupby(['player']).agg(
+    df = df.groupby(['player'], observed=True).agg(
         {
             'deed_uid': 'count',
             'total_harvest_pp': 'sum',
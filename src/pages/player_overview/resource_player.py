@@ -4,7 +4,7 @@ import streamlit as st
 
 from src.static.static_values_enum import PRODUCING_RESOURCES, NATURAL_RESOURCE
 from src.utils.log_util import configure_logger
-from src.utils.resource_util import calc_costs, get_price
+from src.utils.resource_util import add_costs
 
 log = configure_logger(__name__)
 
@@ -12,7 +12,7 @@ max_cols = 2
 tax_rate = 0.9
 
 
-def get_resource_region_overview(df, player, metrics_df, prices_df):
+def get_resource_region_overview(df, player, price_book):
     st.markdown("## Region production overview")
 
     df = prepare_data(df)
@@ -42,12 +42,12 @@ def get_resource_region_overview(df, player, metrics_df, prices_df):
 
     render_regions(summary_df, amount_df)
 
-    dec_net = total_section(summary_df, amount_df, metrics_df, prices_df)
+    dec_net = total_section(summary_df, amount_df, price_book)
     add_self_sufficiency(dec_net, player)
 
 
 def prepare_data(df):
-    grouped_df = df.groupby(["region_uid", 'token_symbol']).agg(
+    grouped_df = df.groupby(["region_uid", 'token_symbol'], observed=True).agg(
         {'total_harvest_pp': 'sum',
          'total_base_pp_after_cap': 'sum',
          'total_dec_stake_needed': 'sum',
@@ -58,7 +58,7 @@ def prepare_data(df):
 
     # Count token_symbols per region_uid
     token_counts = (
-        df.groupby(['region_uid', 'token_symbol'])
+        df.groupby(['region_uid', 'token_symbol'], observed=True)
         .agg(count=('token_symbol', 'count'))
         .reset_index()
     )
@@ -69,14 +69,15 @@ def prepare_data(df):
 
 
 def prepare_summary(df, include_taxes, include_fee):
-    df = pd.concat([df, df.apply(calc_costs, axis=1)], axis=1)
+    df = add_costs(df)
 
     produced = df.pivot_table(
         index='region_uid',
         columns='token_symbol',
         values='rewards_per_hour',
         aggfunc='sum',
-        fill_value=0
+        fill_value=0,
+        observed=True
     ).add_prefix('produced_').reset_index()
 
     if include_taxes:
@@ -84,7 +85,7 @@ def prepare_summary(df, include_taxes, include_fee):
         produced = produced.reset_index()
 
     cost_cols = [f'cost_per_h_{res.lower()}' for res in NATURAL_RESOURCE]
-    cost_df = df.groupby('region_uid')[cost_cols].sum().reset_index()
+    cost_df = df.groupby('region_uid', observed=True)[cost_cols].sum().reset_index()
 
     summary = pd.merge(produced, cost_df, on='region_uid')
 
@@ -135,7 +136,7 @@ def build_region_markdown(row, region_df):
     region = row["region_uid"]
 
     # Count per resource
-    region_counts = region_df.groupby("token_symbol")["count"].sum().to_dict()
+    region_counts = region_df.groupby("token_symbol", observed=True)["count"].sum().to_dict()
 
     header_row = "|              |"
     sub_header_row = "|--------------|"
@@ -216,7 +217,7 @@ def add_self_sufficiency(dec_net, player):
     st.plotly_chart(fig, use_container_width=True)
 
 
-def total_section(summary_df, amount_df, metrics_df, prices_df):
+def total_section(summary_df, amount_df, price_book):
     total_net = {
         key.lower(): summary_df[f"adj_net_{key.lower()}"].sum()
         for key in PRODUCING_RESOURCES
@@ -226,10 +227,8 @@ def total_section(summary_df, amount_df, metrics_df, prices_df):
         f"{color_cell(total_net['stone'])} | {color_cell(total_net['iron'])} | {color_cell(total_net['research'])} | "
         f"{color_cell(total_net['aura'])} | {color_cell(total_net['sps'])} |"
     )
-    dec_net = {
-        key.lower(): get_price(metrics_df, prices_df, key, summary_df[f"adj_net_{key.lower()}"].sum())
-        for key in PRODUCING_RESOURCES
-    }
+    dec_values = price_book.to_dec(PRODUCING_RESOURCES, [total_net[key.lower()] for key in PRODUCING_RESOURCES])
+    dec_net = {key.lower(): float(value) for key, value in zip(PRODUCING_RESOURCES, dec_values)}
     dec_total_net = (
         f" | **Total Net (DEC)** | {color_cell(dec_net['grain'])} | {color_cell(dec_net['wood'])} | "
         f"{color_cell(dec_net['stone'])} | {color_cell(dec_net['iron'])} | {color_cell(dec_net['research'])} | "
@@ -1,4 +1,6 @@
-import concurrent.futures
+import asyncio
+import math
+import time
 
 import pandas as pd
 import streamlit as st
@@ -11,6 +13,18 @@ from src.pages.player_overview.components.deed_type_boost import add_deed_type_b
 from src.pages.player_overview.components.items import add_items, item_boost_style
 from src.pages.player_overview.components.production import add_production, production_card_style
 from src.pages.player_overview.components.rarity import add_rarity_boost
+from src.utils.log_util import configure_logger
+from src.utils.resource_util import add_costs
+
+log = configure_logger(__name__)
+
+DEEDS_PER_PAGE = 50
+PAGE_KEY = "deed_overview_page"
+# Seconds a fetch of staked assets (including retries) may take before the deed is shown without them
+ASSET_TIMEOUT_SECONDS = 15
+RENDER_INTERVAL_SECONDS = 0.5
+ASSETS_LOADING = "<span style='color:gray'>Loading...</span>"
+ASSETS_UNAVAILABLE = "<span style='color:gray'>Staked assets unavailable</span>"
 
 deed_tile_wrapper_css = """
 <style>
@@ -54,8 +68,41 @@ deed_tile_wrapper_css = """
 """
 
 
-def process_deed_row(row, include_taxes):
-    deed_uid = row['deed_uid']
+def get_tile_without_assets(card_html, production_html, total_boost, message):
+    return f"""<div class="deed-tile">
+        {card_html}
+        <div class="wrapper">
+            <div>Boosts: <span style='color:gray'>({total_boost}%)</span><br></div>
+            <div class="info-wrapper">
+                <div class="boost-section" style="text-align: left;">{message}</div>
+                <div class="boost-section" style="text-align: left;"><div></div></div>
+                <div class="boost-section" style="text-align: left;"><div></div></div>
+                <div class="boost-section" style="text-align: left;"><div></div></div>
+                <div class="boost-section" style="text-align: left;"><div></div></div>
+            </div>
+        </div>
+        <div class="wrapper">
+            <p>Cards:</p>
+            <div class="info-wrapper">
+                <div class="cards-section" style="text-align: left;">{message}</div>
+            </div>
+        </div>
+        <div class="wrapper">
+            <p>Production:</p>
+            <div class="info-wrapper">
+                <div class="production-section" style="text-align: left;">
+                    {production_html}
+                </div>
+            </div>
+        </div>
+    </div>"""
+
+
+def process_deed_row(row, include_taxes, asset_info=None, message=ASSETS_UNAVAILABLE):
+    """
+    Tile of a deed with its staked assets. Without asset_info (still loading or failed) the tile is shown
+    with message in place of the staked items and cards.
+    """
     total_boost = row['total_boost']
     deed_type = row['deed_type']
 
@@ -63,42 +110,16 @@ def process_deed_row(row, include_taxes):
     production_html = add_production(row, include_taxes)
 
     if deed_type == 'Unsurveyed Deed':
-        return {
-            'tile': f"""<div class="deed-tile">
-                {card_html}
-                <div class="wrapper">
-                    <div>Boosts: <span style='color:gray'>(0%)</span><br></div>
-                    <div class="info-wrapper">
-                        <div class="boost-section" style="text-align: left;">N/A</div>
-                        <div class="boost-section" style="text-align: left;"><div></div></div>
-                        <div class="boost-section" style="text-align: left;"><div></div></div>
-                        <div class="boost-section" style="text-align: left;"><div></div></div>
-                        <div class="boost-section" style="text-align: left;"><div></div></div>
-                    </div>
-                </div>
-                <div class="wrapper">
-                    <p>Cards:</p>
-                    <div class="info-wrapper">
-                        <div class="cards-section" style="text-align: left;">N/A</div>
-                    </div>
-                </div>
-                <div class="wrapper">
-                    <p>Production:</p>
-                    <div class="info-wrapper">
-                        <div class="production-section" style="text-align: left;">
-                            {production_html}
-                        </div>
-                    </div>
-                </div>
-            </div>"""
-        }
+        return {'tile': get_tile_without_assets(card_html, production_html, 0, 'N/A')}
 
     if pd.isna(total_boost):
         total_boost = 0
     total_boost = int(float(total_boost) * 100)
 
+    if asset_info is None:
+        return {'tile': get_tile_without_assets(card_html, production_html, total_boost, message)}
+
     biome_html = add_biome_boosts(row)
-    asset_info = spl.get_staked_assets(deed_uid)
     items = asset_info['items']
     cards = asset_info['cards']
     items_html = add_items(items)
@@ -136,6 +157,32 @@ def process_deed_row(row, include_taxes):
     }
 
 
+def render_tiles(placeholder, tiles):
+    placeholder.markdown(f'<div class="deed-tile-wrapper">{"".join(tiles)}</div>', unsafe_allow_html=True)
+
+
+def get_page_deeds(df: pd.DataFrame) -> pd.DataFrame:
+    """The deeds of the selected page, DEEDS_PER_PAGE at a time."""
+    pages = max(math.ceil(df.index.size / DEEDS_PER_PAGE), 1)
+    if pages == 1:
+        return df
+
+    # The filters may have reduced the number of pages since the last run
+    if st.session_state.get(PAGE_KEY, 1) > pages:
+        st.session_state[PAGE_KEY] = 1
+
+    page = st.selectbox(
+        "Page",
+        options=list(range(1, pages + 1)),
+        format_func=lambda p: f"{p} of {pages}",
+        key=PAGE_KEY,
+    )
+    first = (page - 1) * DEEDS_PER_PAGE
+    last = min(first + DEEDS_PER_PAGE, df.index.size)
+    st.caption(f"Showing deeds {first + 1} - {last} of {df.index.size}")
+    return df.iloc[first:last]
+
+
 def get_player_deed_overview(df: pd.DataFrame):
     st.markdown(f"## Deed Overview ({df.index.size})")
 
@@ -144,16 +191,15 @@ def get_player_deed_overview(df: pd.DataFrame):
 
     st.session_state.include_taxes_deeds = st.checkbox(
         "Include taxes (10%)",
-        value=st.session_state.include_taxes,
+        value=st.session_state.get('include_taxes', True),
         help="10% Taxes are deducted from the produced amount",
         key="deed_overview_taxes",
     )
 
     include_taxes_deeds = st.session_state.include_taxes_deeds
 
-    if df.index.size > 200:
-        st.warning("Too many deeds – displaying the first 200 (please use filters)")
-        df = df.head(200)
+    df = get_page_deeds(df)
+    df = add_costs(df)
 
     # Add styles once
     st.markdown(
@@ -166,12 +212,26 @@ def get_player_deed_overview(df: pd.DataFrame):
         unsafe_allow_html=True
     )
 
-    # Process deeds concurrently
-    with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
-        results = list(executor.map(
-            lambda row: process_deed_row(row, include_taxes_deeds),
-            [row for _, row in df.iterrows()]
-        ))
-
-    tiles_html = ''.join([res['tile'] for res in results])
-    st.markdown(f'<div class="deed-tile-wrapper">{tiles_html}</div>', unsafe_allow_html=True)
+    # Every tile is shown right away, deeds still waiting for their staked assets show as loading
+    rows = [row for _, row in df.iterrows()]
+    tiles = [process_deed_row(row, include_taxes_deeds, message=ASSETS_LOADING)['tile'] for row in rows]
+    placeholder = st.empty()
+    render_tiles(placeholder, tiles)
+
+    positions = {row['deed_uid']: i for i, row in enumerate(rows) if row['deed_type'] != 'Unsurveyed Deed'}
+    if not positions:
+        return
+
+    last_render = time.monotonic()
+
+    def add_tile(deed_uid, asset_info):
+        # Failed and timed out fetches (None) get the degraded tile
+        nonlocal last_render
+        i = positions[deed_uid]
+        tiles[i] = process_deed_row(rows[i], include_taxes_deeds, asset_info)['tile']
+        if time.monotonic() - last_render >= RENDER_INTERVAL_SECONDS:
+            render_tiles(placeholder, tiles)
+            last_render = time.monotonic()
+
+    asyncio.run(spl.get_staked_assets_batch(list(positions), ASSET_TIMEOUT_SECONDS, on_result=add_tile))
+    render_tiles(placeholder, tiles)
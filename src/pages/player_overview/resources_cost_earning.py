@@ -2,7 +2,7 @@ import streamlit as st
 
 from src.static.static_values_enum import consume_rates, resource_icon_map, MULTIPLE_CONSUMING_RESOURCE
 from src.utils.log_util import configure_logger
-from src.utils.resource_util import reorder_column, get_price
+from src.utils.resource_util import reorder_column
 
 log = configure_logger(__name__)
 
@@ -27,13 +27,13 @@ def reset_on_change(_key):
     return reset
 
 
-def get_resource_cost(df, resource_pool_metric, prices_df):
+def get_resource_cost(df, price_book):
     max_cols = 3
     total_net_dec = 0
 
     st.markdown("## Calculate DEC cost/earnings")
 
-    df = df.groupby(['token_symbol']).agg(
+    df = df.groupby(['token_symbol'], observed=True).agg(
         {
             'total_harvest_pp': 'sum',
             'total_base_pp_after_cap': 'sum',
@@ -71,8 +71,7 @@ def get_resource_cost(df, resource_pool_metric, prices_df):
                                                    boosted_pp,
                                                    rewards_per_hour,
                                                    resource,
-                                                   resource_pool_metric,
-                                                   prices_df,
+                                                   price_book,
                                                    st.session_state.taxes_fee,
                                                    st.session_state.conversion_fee)
             if net_dec:
@@ -111,8 +110,7 @@ def add_research_production_cost(base_pp,
                                  boosted_pp,
                                  rewards_per_hour,
                                  resource,
-                                 metrics_df,
-                                 priced_df,
+                                 price_book,
                                  include_tax_fee,
                                  include_conversion_fee):
     consume_list = ['GRAIN']
@@ -148,14 +146,11 @@ def add_research_production_cost(base_pp,
         consume_list.append('IRON')
 
     # DEC equivalents
-    dec_costs = {
-        res: get_price(metrics_df, priced_df, res, costs[res])
-        for res in costs
-    }
+    dec_costs = dict(zip(costs, price_book.to_dec(list(costs), list(costs.values())).tolist()))
 
     # Total DEC
     total_dec_cost = sum(dec_costs.values())
-    total_dec_earning = get_price(metrics_df, priced_df, resource, rewards_per_hour)
+    total_dec_earning = price_book.to_dec_value(resource, rewards_per_hour)
     extra_txt, total_dec_earning = calculate_conversion_fees(include_conversion_fee, total_dec_earning)
 
     earning_txt = (f"<h8>{icon_html(resource_icon_map['DEC'])} DEC Earning: {round(total_dec_earning, 3)} /hr"
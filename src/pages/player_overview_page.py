@@ -2,15 +2,22 @@ import pandas as pd
 import streamlit as st
 
 from src.api import spl
-from src.pages.components import filter_section, sorting_section
+from src.pages.components import filter_section, sorting_section, lazy_tabs
 from src.pages.player_overview import resources_cost_earning, resource_player, resource_player_deed, rankings, \
     alert_section
 from src.pages.player_overview.helper.progress_helper import get_progress_info
-from src.utils import data_helper
+from src.utils import data_helper, resource_util
 from src.utils.log_util import configure_logger
 
 log = configure_logger(__name__)
 
+TAB_STATUS = {
+    "Resource Production": "📊 Calculating resource costs and earnings...",
+    "Region Overview": "🌍 Generating region overview...",
+    "Land Rankings": "📊 Create land ranking overview ...",
+    "Deed Overview": "📜 Building deed overview (fetching staked assets)...",
+}
+
 
 def prepare_data(player):
     if player:
@@ -30,17 +37,8 @@ def prepare_data(player):
     return pd.DataFrame()
 
 
-def get_progress_info_row(row):
-    projected_end_date = row.get('projected_end', None)
-    projected_created_date = row.get('project_created_date', None)
-    hours_since_last_op = row.get('hours_since_last_op', 0)
-    boosted_pp = row.get('total_harvest_pp', 0)
-    return get_progress_info(hours_since_last_op, projected_created_date, projected_end_date, boosted_pp)
-
-
 def get_page():
-    metrics_df = spl.get_land_resources_pools()
-    prices_df = spl.get_prices()
+    price_book = resource_util.get_price_book()
     all_daily_df = data_helper.get_land_data_merged()
 
     # Text input with default from session
@@ -72,31 +70,28 @@ def get_page():
         return
 
     # Add alert section for deeds that need attention:
-    progress_info = filtered_df.apply(get_progress_info_row, axis=1)
+    progress_info = get_progress_info(filtered_df)
     enriched_df = filtered_df.join(progress_info).copy()
-    sorted_df = sorting_section.get_sorting_section(enriched_df)
+    # Positions of the filtered deeds in the fetched data, the sort index is built on the latter
+    rows = df.index.get_indexer(filtered_df.index)
+    sorted_df = sorting_section.get_sorting_section(enriched_df, sorting_section.get_sort_index(df), rows)
 
     alert_section.get_section(sorted_df)
 
-    # Tabs view
-    tab1, tab2, tab3, tab4 = st.tabs([
-        "Resource Production",
-        "Region Overview",
-        "Land Rankings",
-        "Deed Overview",
-    ])
-    with tab1:
-        add_spinner(spinner_placeholder, "📊 Calculating resource costs and earnings...")
-        resources_cost_earning.get_resource_cost(sorted_df, metrics_df, prices_df)
-    with tab2:
-        add_spinner(spinner_placeholder, "🌍 Generating region overview...")
-        resource_player.get_resource_region_overview(sorted_df, player, metrics_df, prices_df)
-    with tab3:
-        add_spinner(spinner_placeholder, "📊 Create land ranking overview ...")
-        rankings.add_ranking_overview(all_daily_df, player)
-    with tab4:
-        add_spinner(spinner_placeholder, "📜 Building deed overview (fetching staked assets)...")
-        resource_player_deed.get_player_deed_overview(sorted_df)
+    # Tabs view, only the selected tab is built
+    lazy_tabs.render_tabs(
+        {
+            "Resource Production": lambda: resources_cost_earning.get_resource_cost(sorted_df, price_book),
+            "Region Overview": lambda: resource_player.get_resource_region_overview(sorted_df, player, price_book),
+            "Land Rankings": lambda: rankings.add_ranking_overview(all_daily_df, player),
+            "Deed Overview": lambda: resource_player_deed.get_player_deed_overview(sorted_df),
+        },
+        key="player_overview_tab",
+        # The rankings only depend on the snapshot and the player, not on the player's filters
+        memo_key=lazy_tabs.get_memo_key(player, filtered=False),
+        cached=["Land Rankings"],
+        on_select=lambda label: add_spinner(spinner_placeholder, TAB_STATUS[label]),
+    )
 
     spinner_placeholder.empty()
 
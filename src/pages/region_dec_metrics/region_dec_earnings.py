@@ -2,8 +2,10 @@ import pandas as pd
 import streamlit as st
 
 from src.graphs.region_dec_graphs import add_total_dec, add_plots_vs_dec, add_dec, add_ratio_rank_plot
+from src.pages.components import lazy_tabs
 from src.utils.large_number_util import format_large_number
 from src.utils.log_util import configure_logger
+from src.utils.player_index import PlayerIndex
 
 log = configure_logger(__name__)
 
@@ -75,6 +77,13 @@ def add_ratios(df):
     return df
 
 
+def get_player_row(df, player_name):
+    """Row of the player, player_name is the name as stored (resolved through the player index)."""
+    if not player_name:
+        return pd.DataFrame()
+    return df[df['player'] == player_name].head(1)
+
+
 def add_leaderboard_section(df, player_name=None):
     # Define leaderboards with renamed columns
     leaderboards = {
@@ -120,6 +129,7 @@ def add_leaderboard_section(df, player_name=None):
     ]
 
     titles = list(leaderboards.keys())
+    player_row = get_player_row(df, player_name)
 
     for i, title in enumerate(titles):
         row = layout[i // 3]
@@ -128,8 +138,6 @@ def add_leaderboard_section(df, player_name=None):
         with col:
             st.markdown(f"### {title}")
             data = leaderboards[title]
-            player_row = df[df['player'].str.lower() == player_name] if player_name else pd.DataFrame()
-
             if not player_row.empty:
                 player_data = player_row.iloc[0]
 
@@ -175,80 +183,96 @@ def add_leaderboard_section(df, player_name=None):
             st.dataframe(data.reset_index(drop=True), hide_index=True, width=300)
 
 
-def get_page(total_df):
+def get_page(total_df, player_index: PlayerIndex):
+    """:param player_index: player index of the snapshot, shared by every session."""
     total_df = add_ratios(total_df)
 
     player_name = st.text_input("Enter hive name to highlight")
+    # Highlight the player as stored, whatever the case of the entered name
+    player_name = player_index.get_name(player_name) or player_name
     st.title("Leaderboards (Top 200)")
     add_leaderboard_section(total_df, player_name)
 
     st.title("Charts")
     df = filter_top(total_df)
 
-    tab1, tab2, tab3, tab4 = st.tabs([
-        "DEC",
-        "LCE",
-        "LPE",
-        "LDE"
-    ])
-    with tab1:
-        add_dec(df)
-        add_total_dec(df)
-        add_plots_vs_dec(df)
-    with tab2:
-        st.info("Land Card Efficiency (LCE) = Total PP Employed (Boosted PP) / Total DEC earned per hour")
-
-        add_ratio_rank_plot(
-            df,
-            x_column='LCE_ratio_boosted',
-            y_column='LCE_boosted_rank',
-            highlight_player=player_name,
-            title='LCE Ratio vs Rank (Bubble = Boosted PP)',
-            xaxis_title='LCE_ratio_boosted',
-            yaxis_title='LCE_boosted_rank',
-            hover_label='LCE_boosted',
-            customdata_column='total_base_pp_after_cap'
-        )
-    with tab3:
-
-        st.info("Land Plot Efficiency (LPE) = Total DEC earned per hour / Number of Active Plots")
-
-        add_ratio_rank_plot(
-            df,
-            x_column='LPE_ratio',
-            y_column='LPE_rank',
-            highlight_player=player_name,
-            title='LPE Ratio vs Rank (Bubble = Base PP)',
-            xaxis_title='LPE_ratio',
-            yaxis_title='LPE_rank',
-            hover_label='LPE_ratio',
-            customdata_column='total_base_pp_after_cap'
-        )
-        add_ratio_rank_plot(
-            df,
-            x_column='count',
-            y_column='total_dec',
-            highlight_player=player_name,
-            title='DEC generated per hour (Bubble = Base PP)',
-            xaxis_title='Amount of Plots',
-            yaxis_title='Total DEC',
-            hover_label='DEC',
-            customdata_column='total_base_pp_after_cap'
-        )
-    with tab4:
-        st.info("Land DEC Efficiency (LDE) = Total DEC Staked in Use / (DEC earned per hour * 24)")
-
-        add_ratio_rank_plot(
-            df,
-            x_column='LDE_ratio',
-            y_column='LDE_rank',
-            highlight_player=player_name,
-            title='LDE Ratio vs Rank (Bubble = Base PP)',
-            xaxis_title='LDE_ratio',
-            yaxis_title='LDE_rank',
-            hover_label='LDE_ratio',
-            customdata_column='total_base_pp_after_cap'
-        )
+    lazy_tabs.render_tabs(
+        {
+            "DEC": lambda: add_dec_tab(df),
+            "LCE": lambda: add_lce_tab(df, player_name),
+            "LPE": lambda: add_lpe_tab(df, player_name),
+            "LDE": lambda: add_lde_tab(df, player_name),
+        },
+        key="region_dec_tab",
+        memo_key=lazy_tabs.get_memo_key(
+            player_name, st.session_state.selected_metric, st.session_state.selected_limit),
+        cached=["DEC", "LCE", "LPE", "LDE"],
+    )
 
     with st.expander("DATA", expanded=False):
         st.dataframe(total_df)
+
+
+def add_dec_tab(df):
+    add_dec(df)
+    add_total_dec(df)
+    add_plots_vs_dec(df)
+
+
+def add_lce_tab(df, player_name):
+    st.info("Land Card Efficiency (LCE) = Total PP Employed (Boosted PP) / Total DEC earned per hour")
+
+    add_ratio_rank_plot(
+        df,
+        x_column='LCE_ratio_boosted',
+        y_column='LCE_boosted_rank',
+        highlight_player=player_name,
+        title='LCE Ratio vs Rank (Bubble = Boosted PP)',
+        xaxis_title='LCE_ratio_boosted',
+        yaxis_title='LCE_boosted_rank',
+        hover_label='LCE_boosted',
+        customdata_column='total_base_pp_after_cap'
+    )
+
+
+def add_lpe_tab(df, player_name):
+    st.info("Land Plot Efficiency (LPE) = Total DEC earned per hour / Number of Active Plots")
+
+    add_ratio_rank_plot(
+        df,
+        x_column='LPE_ratio',
+        y_column='LPE_rank',
+        highlight_player=player_name,
+        title='LPE Ratio vs Rank (Bubble = Base PP)',
+        xaxis_title='LPE_ratio',
+        yaxis_title='LPE_rank',
+        hover_label='LPE_ratio',
+        customdata_column='total_base_pp_after_cap'
+    )
+    add_ratio_rank_plot(
+        df,
+        x_column='count',
+        y_column='total_dec',
+        highlight_player=player_name,
+        title='DEC generated per hour (Bubble = Base PP)',
+        xaxis_title='Amount of Plots',
+        yaxis_title='Total DEC',
+        hover_label='DEC',
+        customdata_column='total_base_pp_after_cap'
+    )
+
+
+def add_lde_tab(df, player_name):
+    st.info("Land DEC Efficiency (LDE) = Total DEC Staked in Use / (DEC earned per hour * 24)")
+
+    add_ratio_rank_plot(
+        df,
+        x_column='LDE_ratio',
+        y_column='LDE_rank',
+        highlight_player=player_name,
+        title='LDE Ratio vs Rank (Bubble = Base PP)',
+        xaxis_title='LDE_ratio',
+        yaxis_title='LDE_rank',
+        hover_label='LDE_ratio',
+        customdata_column='total_base_pp_after_cap'
+    )
@@ -4,39 +4,84 @@ import streamlit as st
 from src.pages.components import filter_section
 from src.pages.components.filter_section import FilterKey
 from src.pages.region_dec_metrics import region_dec_earnings
-from src.utils import data_helper
+from src.utils import data_helper, data_loader_new, query_engine, snapshot_util
 from src.utils.log_util import configure_logger
+from src.utils.snapshot_store import make_read_only
 
 log = configure_logger(__name__)
 
+PLAYER_SUMMARY_TABLE = 'player_production_summary'
 
-def add_dec_columns(land_df, player_df):
-    df = land_df.groupby('player').agg({
+
+# Stake per player, the staked DEC is per region so it is only counted once per region
+DEC_STAKE_QUERY = """
+    SELECT player,
+           coalesce(sum(total_dec_stake_needed), 0) AS total_dec_stake_needed,
+           coalesce(sum(total_dec_stake_in_use), 0) AS total_dec_stake_in_use,
+           coalesce(sum(total_dec_staked), 0) AS total_dec_staked
+    FROM (
+        SELECT player,
+               region_uid,
+               sum(total_dec_stake_needed) AS total_dec_stake_needed,
+               sum(total_dec_stake_in_use) AS total_dec_stake_in_use,
+               any_value(total_dec_staked) AS total_dec_staked
+        FROM land
+        WHERE player IS NOT NULL
+        GROUP BY player, region_uid
+    )
+    GROUP BY player
+"""
+
+
+def get_dec_stake_per_player():
+    """Stake per player, computed once per snapshot and shared by every session (read-only)."""
+    version = snapshot_util.get_current_version()
+    if version is None:
+        return compute_dec_stake_per_player()
+    return data_loader_new.load_derived(
+        version, 'dec_stake_per_player', lambda: make_read_only(compute_dec_stake_per_player()))
+
+
+def compute_dec_stake_per_player():
+    if query_engine.is_enabled():
+        try:
+            return query_engine.query(DEC_STAKE_QUERY)
+        except query_engine.duckdb.Error as e:
+            # e.g. a snapshot without the land table, the pandas path joins it on the fly
+            log.warning(f'DEC stake query failed, falling back to pandas: {e}')
+
+    land_df = data_helper.get_land_data_merged()
+    df = land_df.groupby('player', observed=True).agg({
         'total_dec_stake_needed': 'sum',
         'total_dec_stake_in_use': 'sum',
     }).reset_index()
-    player_df = pd.merge(player_df, df, on='player')
     df1 = (
-        land_df.groupby(['region_uid', 'player'], as_index=False)
+        land_df.groupby(['region_uid', 'player'], as_index=False, observed=True)
         .agg({'total_dec_staked': 'first'})
-        .groupby('player', as_index=False)
+        .groupby('player', as_index=False, observed=True)
         .agg({'total_dec_staked': 'sum'})
     )
-    return pd.merge(player_df, df1, on=['player'])
+    return pd.merge(df, df1, on=['player'])
+
+
+def add_dec_columns(player_df):
+    return pd.merge(player_df, get_dec_stake_per_player(), on='player')
 
 
 def get_page():
     date_str = data_helper.get_last_updated()
     if date_str:
-        land_df = data_helper.get_land_data_merged()
         player_summary_df = data_helper.get_player_summary_data()
-        player_summary_df = add_dec_columns(land_df, player_summary_df)
+        # Built once per snapshot, the merged frame below is not a snapshot table
+        player_index = filter_section.get_player_index(player_summary_df, PLAYER_SUMMARY_TABLE)
+        player_summary_df = add_dec_columns(player_summary_df)
         if not player_summary_df.empty:
             st.subheader(f'Data snapshot is from: {date_str.strftime('%Y-%m-%d %H:%M:%S')}')
 
-            filtered_df = filter_section.get_page(player_summary_df, only=[FilterKey.PLAYERS])
+            filtered_df = filter_section.get_page(player_summary_df, only=[FilterKey.PLAYERS],
+                                                  player_index=player_index)
             if not filtered_df.empty:
-                region_dec_earnings.get_page(filtered_df)
+                region_dec_earnings.get_page(filtered_df, player_index)
             else:
                 st.warning("No Data")
         else:
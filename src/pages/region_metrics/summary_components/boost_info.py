@@ -80,7 +80,7 @@ def create_boost_html(image_url, label, boost_pct, count):
 
 def process_boost_column(df, col_name, boost_map, label_prefix):
     boost_df = df.loc[df[col_name] > 0.0]
-    boost_df = boost_df.groupby(col_name).size().reset_index(name='count')
+    boost_df = boost_df.groupby(col_name, observed=True).size().reset_index(name='count')
 
     html_blocks = ""
     for _, row in boost_df.iterrows():
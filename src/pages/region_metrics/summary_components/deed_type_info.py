@@ -4,7 +4,7 @@ from src.static.icons import SPL_WEB_URL
 
 
 def print_deed_types(df):
-    grouped = df.groupby('deed_type').size().reset_index(name='count')
+    grouped = df.groupby('deed_type', observed=True).size().reset_index(name='count')
     grouped = grouped.sort_values(by='deed_type', ascending=True)
 
     st.markdown("### Deed Type Overview")
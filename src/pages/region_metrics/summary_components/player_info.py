@@ -4,6 +4,7 @@ import streamlit as st
 def print_player_info(df):
     unique_players = df.player.unique().size
     top_ten_holders = df['player'].value_counts().head(10)
+    top_ten_holders = top_ten_holders[top_ten_holders > 0]
     col1, col2 = st.columns(2)
     with col1:
         st.markdown("### Top 10 Holders")
@@ -7,7 +7,7 @@ rarity_order = ['natural', 'magical', 'occupied', 'kingdom']
 
 
 def print_plot_status(df):
-    grouped = df.groupby('plot_status').size().reset_index(name='count')
+    grouped = df.groupby('plot_status', observed=True).size().reset_index(name='count')
     grouped['plot_status_cat'] = pd.Categorical(grouped['plot_status'], categories=rarity_order, ordered=True)
     grouped = grouped.sort_values('plot_status_cat')
 
@@ -8,6 +8,7 @@ rarity_order = ['common', 'rare', 'epic', 'legendary', 'mythic']
 
 def print_rarity(df):
     rarities = df['rarity'].value_counts().reset_index()
+    rarities = rarities[rarities['count'] > 0]
     rarities['rarity_cat'] = pd.Categorical(rarities['rarity'], categories=rarity_order, ordered=True)
     rarities = rarities.sort_values('rarity_cat')
 
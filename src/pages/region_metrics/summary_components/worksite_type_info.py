@@ -6,6 +6,7 @@ from src.static.static_values_enum import worksite_type_mapping
 def print_worksite_types(df):
     worksite_types = df['worksite_type'].value_counts().reset_index()
     worksite_types.columns = ['worksite_type', 'count']
+    worksite_types = worksite_types[worksite_types['count'] > 0]
 
     ordered_keys = list(worksite_type_mapping.keys())
     worksite_types = worksite_types[worksite_types['worksite_type'].isin(ordered_keys)].copy()
@@ -5,12 +5,12 @@ from src.graphs import region_graphs
 def get_active_df(df, group_by_col):
     active_df = (
         df[df["total_harvest_pp"] > 0]
-        .groupby(group_by_col)
+        .groupby(group_by_col, observed=True)
         .size()
         .reset_index(name="active")
     )
     total_df = (
-        df.groupby(group_by_col)
+        df.groupby(group_by_col, observed=True)
         .size()
         .reset_index(name="total")
     )
@@ -41,7 +41,7 @@ def get_page(df):
 
 def add_castle_income(castles_df, all_resources):
     # Group all materials by region and tract to calculate total rewards per tract
-    region_income = all_resources.groupby(['region_uid', 'token_symbol'])[
+    region_income = all_resources.groupby(['region_uid', 'token_symbol'], observed=True)[
         'paid_taxes'].sum().reset_index()
     merged = region_income.merge(
         castles_df[
@@ -66,7 +66,7 @@ def add_castle_income(castles_df, all_resources):
 
 def add_keep_income(keeps_df, all_resources):
     # Group all materials by region and tract to calculate total rewards per tract
-    tract_income = all_resources.groupby(['region_uid', 'tract_number', 'token_symbol'])[
+    tract_income = all_resources.groupby(['region_uid', 'tract_number', 'token_symbol'], observed=True)[
         'paid_taxes'].sum().reset_index()
 
     merged = tract_income.merge(
@@ -105,18 +105,18 @@ def create_tax_income_per_type(merged, keep_castle):
     plot_data = []
 
     if unique_regions > MAX_PLOTS:
-        summary_df = merged.groupby("token_symbol", as_index=False)["tax_income"].sum()
+        summary_df = merged.groupby("token_symbol", as_index=False, observed=True)["tax_income"].sum()
         plot_data.append(("Overall Tax Income", summary_df))
     elif unique_regions > 1:
-        grouped = merged.groupby(["region_uid", "token_symbol"], as_index=False)["tax_income"].sum()
-        for region, group_df in grouped.groupby("region_uid"):
+        grouped = merged.groupby(["region_uid", "token_symbol"], as_index=False, observed=True)["tax_income"].sum()
+        for region, group_df in grouped.groupby("region_uid", observed=True):
             plot_data.append((f"Region {region}", group_df))
     elif unique_tracts > 1:
-        grouped = merged.groupby(["tract_number", "token_symbol"], as_index=False)["tax_income"].sum()
+        grouped = merged.groupby(["tract_number", "token_symbol"], as_index=False, observed=True)["tax_income"].sum()
         for tract, group_df in grouped.groupby("tract_number"):
             plot_data.append((f"Tract {tract}", group_df))
     else:
-        summary_df = merged.groupby("token_symbol", as_index=False)["tax_income"].sum()
+        summary_df = merged.groupby("token_symbol", as_index=False, observed=True)["tax_income"].sum()
         plot_data.append(("Overall Tax Income", summary_df))
 
     # Limit to max 10 plots
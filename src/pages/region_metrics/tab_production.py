@@ -8,7 +8,7 @@ log = configure_logger(__name__)
 
 
 def group_by_resource(df, group_field):
-    return df.groupby(group_field).agg({
+    return df.groupby(group_field, observed=True).agg({
         'total_harvest_pp': 'sum',
         'total_base_pp_after_cap': 'sum'
     }).reset_index()
@@ -58,7 +58,7 @@ def get_production(df):
 
             # Group non-TAX by token_symbol only (ignore worksite_type)
             non_tax_grouped = non_tax_df.groupby(
-                ["region_uid", "token_symbol"], as_index=False
+                ["region_uid", "token_symbol"], as_index=False, observed=True
             )[["total_base_pp_after_cap", "total_harvest_pp"]].sum()
 
             # Add a placeholder worksite_type for consistency
@@ -66,7 +66,7 @@ def get_production(df):
 
             # Group TAX by token_symbol and worksite_type
             tax_grouped = tax_df.groupby(
-                ["region_uid", "token_symbol", "worksite_type"], as_index=False
+                ["region_uid", "token_symbol", "worksite_type"], as_index=False, observed=True
             )[["total_base_pp_after_cap", "total_harvest_pp"]].sum()
 
             # Combine both
@@ -95,7 +95,7 @@ def get_production(df):
                 pivot_df = pivot_df.reset_index()
                 # Step 4b: Calculate 'active' plots per region
                 active_per_region = resources_df[resources_df.total_harvest_pp > 0].groupby(
-                    "region_uid"
+                    "region_uid", observed=True
                 ).size().reset_index(name="active")
 
                 # Merge into pivot_df
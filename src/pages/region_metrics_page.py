@@ -18,7 +18,7 @@ def get_page():
         region_header.get_page()
         overall_region_info.get_page(all_df)
 
-        filtered_df = filter_section.get_page(all_df)
+        filtered_df = filter_section.get_page(all_df, table='land')
         if not filtered_df.empty:
             main_container.get_page(filtered_df, date_str)
         else:
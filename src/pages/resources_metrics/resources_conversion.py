@@ -1,4 +1,3 @@
-import pandas as pd
 import streamlit as st
 
 from src.static.icons import grain_icon_url, wood_icon_url, stone_icon_url, iron_icon_url, dec_icon_url, sps_icon_url
@@ -45,11 +44,7 @@ def resource_output(resource: str, icon_url: str, value: str):
     st.markdown(f"**{resource}: {value}**")
 
 
-def get_price(metrics_df: pd.DataFrame, token: str,) -> float:
-    return metrics_df[metrics_df['token_symbol'] == token]['dec_price'].values[0]
-
-
-def get_container(metrics_df, prices_df):
+def get_container(price_book):
     with st.container(border=True):
         cols = st.columns([1, 0.3, 1, 0.3, 1, 0.3, 1, 0.3, 1.5])
         with cols[0]:
@@ -70,22 +65,18 @@ def get_container(metrics_df, prices_df):
             st.markdown(f'<div style="{sing_style}" tabindex="-1">=</div>', unsafe_allow_html=True)
         with cols[8]:
             # Perform conversion
-            if not metrics_df.empty and not prices_df.empty:
+            if price_book.is_available():
                 # Safe defaults if None
                 grain = grain or 0
                 wood = wood or 0
                 stone = stone or 0
                 iron = iron or 0
 
-                dec_total = (
-                        (grain / get_price(metrics_df, 'GRAIN')) * transaction_fee +
-                        (wood / get_price(metrics_df, 'WOOD')) * transaction_fee +
-                        (stone / get_price(metrics_df, 'STONE')) * transaction_fee +
-                        (iron / get_price(metrics_df, 'IRON')) * transaction_fee
-                )
+                dec_values = price_book.to_dec(['GRAIN', 'WOOD', 'STONE', 'IRON'], [grain, wood, stone, iron])
+                dec_total = sum((dec_values * transaction_fee).tolist())
 
-                usd_value = dec_total * prices_df['dec'].values[0]
-                sps_amount = usd_value / prices_df['sps'].values[0]
+                usd_value = dec_total * price_book.dec_usd
+                sps_amount = usd_value / price_book.sps_usd
             else:
                 st.warning("Market data not available.")
 
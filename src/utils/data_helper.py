@@ -1,33 +1,10 @@
-import pandas as pd
-
-from src.utils.data_loader_new import load_cached_data, load_cached_last_updated
+from src.utils.data_loader_new import load_cached_data, load_cached_last_updated, load_latest_cached_data
+from src.utils.land_util import merge_land_deed_with_details
 from src.utils.log_util import configure_logger
 
 log = configure_logger(__name__)
 
 
-def merge_land_deed_with_details(deeds, worksite_details, staking_details):
-    df = pd.merge(
-        deeds,
-        worksite_details,
-        how='left',
-        on='deed_uid',
-        suffixes=('', '_worksite_details')
-    )
-    df = pd.merge(
-        df,
-        staking_details,
-        how='left',
-        on='deed_uid',
-        suffixes=('', '_staking_details')
-    )
-
-    matching_columns = df.columns[df.columns.str.endswith(('_worksite_details', '_staking_details'))].tolist()
-    log.debug(f'Reminder watch these columns: {matching_columns}')
-
-    return df.reindex(sorted(df.columns), axis=1)
-
-
 def get_historical_resource_hub_data():
     return load_cached_data('resource_hub_metrics')
 
@@ -37,13 +14,7 @@ def get_historical_resource_tracking_data():
 
 
 def get_latest_resource_tracking_data():
-    df = load_cached_data('resource_tracking')
-    if df.empty or 'date' not in df.columns:
-        return pd.DataFrame()
-
-    df['date'] = pd.to_datetime(df['date'])  # ensure datetime
-    latest_date = df['date'].max()
-    return df[df['date'] == latest_date]
+    return load_latest_cached_data('resource_tracking')
 
 
 def get_historical_resource_supply_data():
@@ -51,20 +22,18 @@ def get_historical_resource_supply_data():
 
 
 def get_latest_resource_total_supply():
-    df = load_cached_data('resource_supply')
-    if df.empty or 'date' not in df.columns:
-        return pd.DataFrame()
-
-    df['date'] = pd.to_datetime(df['date'])  # ensure datetime
-    latest_date = df['date'].max()
-    return df[df['date'] == latest_date]
+    return load_latest_cached_data('resource_supply')
 
 
 def get_land_data_merged():
-    deeds = load_cached_data('deed')
-    worksite_details = load_cached_data('worksite_detail')
-    staking_details = load_cached_data('staking_detail')
-    df = merge_land_deed_with_details(deeds, worksite_details, staking_details)
+    # Deeds joined with their worksite and staking details, materialized during the refresh
+    df = load_cached_data('land')
+    if df.empty:
+        # Snapshot written before the land table existed, join on the fly until the next refresh
+        deeds = load_cached_data('deed')
+        worksite_details = load_cached_data('worksite_detail')
+        staking_details = load_cached_data('staking_detail')
+        df = merge_land_deed_with_details(deeds, worksite_details, staking_details)
     return df
 
 
@@ -77,13 +46,7 @@ def get_historical_active_data():
 
 
 def get_latest_active_data():
-    df = load_cached_data('active')
-    if df.empty or 'date' not in df.columns:
-        return pd.DataFrame()
-
-    df['date'] = pd.to_datetime(df['date'])  # ensure datetime
-    latest_date = df['date'].max()
-    return df[df['date'] == latest_date]
+    return load_latest_cached_data('active')
 
 
 def get_player_summary_data():
@@ -1,25 +1,73 @@
 import streamlit as st
 import asyncio
+import json
 import os
+import shutil
 import time
 from datetime import datetime
+from functools import partial
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
 
 from src.api.db import fetch_data
+from src.api.db.session import POOL_SIZE
+from src.utils import snapshot_util, dtype_util
+from src.utils.land_util import merge_land_deed_with_details
+from src.utils.snapshot_store import SnapshotStore
 from src.utils.log_util import configure_logger
+from src.utils.refresh_lock import RefreshLock, is_refresh_running, get_lock_metrics
 
 log = configure_logger(__name__)
 
-DATA_BASE_DIR = 'data'
-TIMESTAMP_PATH = os.path.join(DATA_BASE_DIR, 'last_updated.txt')
-LOCK_FILE = os.path.join(DATA_BASE_DIR, 'refresh.lock')
-
-
-def is_data_stale() -> bool:
+TIMESTAMP_FILE = 'last_updated.txt'
+MEMORY_REPORT_FILE = 'memory_report.json'
+MANIFEST_FILE = snapshot_util.MANIFEST_FILE
+
+MAX_CONCURRENT_FETCHES = POOL_SIZE
+# A refresh taking longer is cancelled and retried on the next check, kept below the lock's MAX_HOLD_SECONDS
+REFRESH_TIMEOUT = 45 * 60  # seconds
+
+# Large land tables, streamed in chunks straight into parquet so memory is bounded by the chunk size
+STREAMED_TABLES = {
+    'deed': fetch_data.get_deed_chunks,
+    'worksite_detail': fetch_data.get_worksite_detail_chunks,
+    'staking_detail': fetch_data.get_staking_detail_chunks,
+}
+
+# Small tables refreshed from the database in one go
+FETCH_TABLES = {
+    'player_production_summary': fetch_data.get_player_production_summary,
+}
+
+# Append-only tables that only grow by date, these are synced incrementally into one parquet file per date
+HISTORY_TABLES = {
+    'active': fetch_data.get_active,
+    'resource_hub_metrics': fetch_data.get_resource_hub_metrics,
+    'resource_supply': fetch_data.get_resource_supply,
+    'resource_tracking': fetch_data.get_resource_tracking,
+}
+PARTITION_DATE_FORMAT = '%Y-%m-%d'
+# Cache key suffix to load only the latest date partition of a history table
+LATEST_SUFFIX = ':latest'
+
+# Deeds joined with their details, built from the streamed tables once they are all written
+LAND_TABLE = 'land'
+# The land join runs in pandas, it needs the three tables plus the result in memory (see merge_land_tables)
+DEFAULT_MAX_LAND_MERGE_MB = 4 * 1024
+
+
+def is_data_stale(cached=True) -> bool:
+    """
+    Compare the snapshot timestamp with the database.
+    :param cached: Use the (1h) cached database timestamp, the refresh worker polls without cache.
+    """
     last_updated = load_cached_last_updated()
     try:
-        remote = fetch_data.get_last_update()
+        remote = fetch_data.get_last_update() if cached else fetch_data.fetch_last_update()
     except Exception as e:
         log.warning(f"Unable to check DB timestamp: {e}")
         return False  # fail safe: assume not stale
@@ -35,108 +83,406 @@ def is_data_stale() -> bool:
 
 
 def is_refreshing():
-    return os.path.exists(LOCK_FILE)
-
-
-def set_refresh_lock():
-    os.makedirs(DATA_BASE_DIR, exist_ok=True)
-    with open(LOCK_FILE, 'w') as f:
-        f.write(datetime.now().isoformat())
-
-
-def clear_refresh_lock():
-    if os.path.exists(LOCK_FILE):
-        os.remove(LOCK_FILE)
-
-
-async def fetch_all():
-    active = fetch_data.get_active()
-    deed = fetch_data.get_deed()
-    staking_detail = fetch_data.get_staking_detail()
-    worksite_detail = fetch_data.get_worksite_detail()
-    player_production_summary = fetch_data.get_player_production_summary()
-    resource_hub_metrics = fetch_data.get_resource_hub_metrics()
-    resource_supply = fetch_data.get_resource_supply()
-    resource_tracking = fetch_data.get_resource_tracking()
-    last_updated = fetch_data.get_last_update()
-
-    data_dict = {
-        'active': active,
-        'deed': deed,
-        'staking_detail': staking_detail,
-        'worksite_detail': worksite_detail,
-        'player_production_summary': player_production_summary,
-        'resource_hub_metrics': resource_hub_metrics,
-        'resource_supply': resource_supply,
-        'resource_tracking': resource_tracking,
+    return is_refresh_running()
+
+
+def refresh_table(name, fetch_function, save_function) -> dict:
+    return save_function(name, fetch_function())
+
+
+async def fetch_table(name, fetch_function, save_function, semaphore) -> dict | None:
+    """
+    Fetch a single table and write it to the cache, returns its memory report or None when it failed.
+    Failures are logged and isolated so one table never blocks the others.
+    """
+    start_time = time.time()
+    try:
+        async with semaphore:
+            report = await asyncio.to_thread(refresh_table, name, fetch_function, save_function)
+    except Exception as e:
+        log.error(f"Refresh of {name} failed after {time.time() - start_time:.2f} seconds: {e}")
+        return None
+
+    log.info(f"Refreshed {name} ({report['rows']} rows) in {time.time() - start_time:.2f} seconds.")
+    return report
+
+
+async def fetch_all(lock=None):
+    """
+    Refresh every table into a new snapshot directory.
+    The snapshot only becomes visible to readers once all tables are written, a failed refresh is discarded.
+    :param lock: the refresh lock, the snapshot is only published while it is still held.
+    """
+    # Read the timestamp before the data, so an update during the refresh is picked up by the next check
+    last_updated = fetch_data.fetch_last_update()
+    version = snapshot_util.create_snapshot()
+    snapshot_dir = snapshot_util.get_snapshot_dir(version)
+    snapshot_util.seed_snapshot(version, snapshot_util.get_current_version(), HISTORY_TABLES.keys())
+
+    # The semaphore keeps the number of parallel queries within the connection pool
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+    tasks = {
+        name: fetch_table(name, fetch_function, partial(save_table_chunks, snapshot_dir), semaphore)
+        for name, fetch_function in STREAMED_TABLES.items()
+    }
+    tasks |= {
+        name: fetch_table(name, fetch_function, partial(save_table, snapshot_dir), semaphore)
+        for name, fetch_function in FETCH_TABLES.items()
+    }
+    # History tables only fetch from the latest cached date onwards, that date is re-fetched to pick up late rows
+    tasks |= {
+        name: fetch_table(name, partial(fetch_function, since=get_history_watermark(snapshot_dir, name)),
+                          partial(save_history_partitions, snapshot_dir), semaphore)
+        for name, fetch_function in HISTORY_TABLES.items()
     }
+    try:
+        results = await asyncio.gather(*tasks.values())
+    except asyncio.CancelledError:
+        # Running queries end at the database statement_timeout, their output goes with the snapshot
+        snapshot_util.discard_snapshot(version)
+        raise
+
+    reports = dict(zip(tasks.keys(), results))
+    failed = [name for name, report in reports.items() if report is None]
+    if failed:
+        log.error(f"Refresh incomplete, failed tables: {failed}. Keeping the current snapshot, next check retries.")
+        snapshot_util.discard_snapshot(version)
+        return
 
-    save_data(data_dict, last_updated)
+    # Join once here so pages load the merged land table without paying for the join on every rerun
+    try:
+        reports[LAND_TABLE] = await fetch_table(LAND_TABLE, partial(merge_land_tables, snapshot_dir),
+                                                partial(save_table, snapshot_dir), semaphore)
+    except asyncio.CancelledError:
+        snapshot_util.discard_snapshot(version)
+        raise
+    if reports[LAND_TABLE] is None:
+        snapshot_util.discard_snapshot(version)
+        return
+
+    if lock is not None and not lock.is_held():
+        log.error("Refresh lock expired during the refresh, another refresh may be running. Not publishing.")
+        snapshot_util.discard_snapshot(version)
+        return
+
+    save_memory_report(snapshot_dir, reports)
+    save_manifest(snapshot_dir)
+    save_last_updated(snapshot_dir, last_updated)
+    snapshot_util.publish_snapshot(version)
 
 
 def safe_refresh_data(force=False):
+    """Refresh the snapshot when the database has newer data, runs on the refresh worker (never in a page render)."""
     if is_refreshing():
         log.info('Refresh in progress. Skipping.')
         return
-    if not force and not is_data_stale():
+    if not force and not is_data_stale(cached=False):
         log.info('Data is fresh. Skipping refresh.')
         return
 
+    lock = RefreshLock()
+    if not lock.acquire():
+        log.info('Refresh lock held by another process. Skipping.')
+        return
+
     try:
+        # Another replica might have published while we were waiting for the lock
+        if not force and not is_data_stale(cached=False):
+            log.info('Data refreshed by another process. Skipping refresh.')
+            return
+
         start_time = time.time()
         log.info("Start reload of data.....")
 
-        st.warning("""
-        **⚠️ You're the first to trigger the reload process for today — the community thanks you! 🙌**
+        try:
+            asyncio.run(asyncio.wait_for(fetch_all(lock), REFRESH_TIMEOUT))
+        except TimeoutError:
+            log.error(f"Refresh did not finish within {REFRESH_TIMEOUT} seconds, cancelled. Next check retries.")
+            return
 
-        The latest data is being refreshed and should be ready in a few minutes.
+        end_time = time.time()
+        elapsed_time = end_time - start_time
+        log.info(f"Processing data completed in {elapsed_time:.2f} seconds. Lock metrics: {get_lock_metrics()}")
 
-        You have two options:
-        - ⏳ **Wait** a bit and you'll automatically see the freshest data.
-        - 🔄 **Refresh the page (F5)** to load yesterday's data — the update will continue running in the background.
+    finally:
+        lock.release()
+
+
+def save_table(snapshot_dir, name, df) -> dict:
+    """
+    Write a table as parquet and as an uncompressed Arrow IPC file,
+    the IPC file is what pages memory map when they load the table.
+    """
+    log.info(f'Writing {name}')
+    compact_df = dtype_util.compact_dataframe(name, df)
+    compact_df.to_parquet(os.path.join(snapshot_dir, f'{name}.parquet'))
+    feather.write_feather(compact_df, os.path.join(snapshot_dir, f'{name}.arrow'), compression='uncompressed')
+    return dtype_util.create_memory_report(
+        df.index.size, dtype_util.memory_usage_mb(df), dtype_util.memory_usage_mb(compact_df))
+
+
+def save_table_chunks(snapshot_dir, name, chunks) -> dict:
+    """
+    Write DataFrame chunks one by one into a single parquet file, each chunk becomes a row group.
+    Chunks are first written as parts with their own schema: a column can be all null (or hold no fractions)
+    in one chunk and not in the next. The parts are then copied into one file with the schema unified over
+    all chunks, numerics downcast to the type that fits the values of every chunk.
+    Memory stays bounded by a chunk, the file is written next to its final path and moved in place when complete.
+    """
+    path = os.path.join(snapshot_dir, f'{name}.parquet')
+    parts_dir = f'{path}.parts'
+    os.makedirs(parts_dir, exist_ok=True)
+    part_paths = []
+    schemas = []
+    rows = 0
+    original_mb = 0
+    compact_mb = 0
+    numeric_types = {}
+    try:
+        for chunk in chunks:
+            original_mb += dtype_util.memory_usage_mb(chunk)
+            chunk = dtype_util.apply_schema(name, chunk)
+            chunk_types = dtype_util.get_compact_numeric_types(chunk)
+            numeric_types = dtype_util.merge_numeric_types(numeric_types, chunk_types)
+            compact_mb += dtype_util.memory_usage_mb(chunk.astype(chunk_types))
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            table = table.cast(pa.schema([get_part_field(field) for field in table.schema],
+                                         metadata=table.schema.metadata))
+            part_path = os.path.join(parts_dir, f'{len(part_paths)}.parquet')
+            pq.write_table(table, part_path)
+            part_paths.append(part_path)
+            schemas.append(table.schema)
+            rows += chunk.index.size
+            log.info(f'Writing {name} chunk ({rows} rows so far)')
+
+        if not part_paths:
+            raise ValueError(f'No data received for {name}')
+
+        schema = pa.unify_schemas(schemas, promote_options='permissive')
+        schema = pa.schema([get_stream_field(field) for field in schema], metadata=schemas[0].metadata)
+        merge_parquet_parts(part_paths, path, dtype_util.compact_arrow_schema(schema, numeric_types))
+    finally:
+        shutil.rmtree(parts_dir, ignore_errors=True)
+    return dtype_util.create_memory_report(rows, original_mb, compact_mb)
 
-        Thanks for your patience, and sorry for the inconvenience!
-        """)
 
-        set_refresh_lock()
-        asyncio.run(fetch_all())
+def get_part_field(field) -> pa.Field:
+    """Categoricals of every chunk get the same index type, so their parts unify."""
+    if pa.types.is_dictionary(field.type):
+        value_type = pa.string() if pa.types.is_null(field.type.value_type) else field.type.value_type
+        return field.with_type(pa.dictionary(pa.int32(), value_type))
+    return field
 
-        end_time = time.time()
-        elapsed_time = end_time - start_time
-        log.info(f"Processing data completed in {elapsed_time:.2f} seconds.")
 
-    finally:
-        clear_refresh_lock()
+def get_stream_field(field) -> pa.Field:
+    """Columns that are null in every chunk are written as strings."""
+    if pa.types.is_null(field.type):
+        return field.with_type(pa.string())
+    return field
 
 
-def save_data(dict_of_data, last_updated):
-    os.makedirs(DATA_BASE_DIR, exist_ok=True)
-    for name, df in dict_of_data.items():
-        log.info(f'Writing {name}')
-        df.to_parquet(os.path.join(DATA_BASE_DIR, f'{name}.parquet'))
+def merge_parquet_parts(part_paths, path, schema):
+    """Copy parquet parts one by one into a single file with the given schema, memory stays bounded by a part."""
+    tmp_path = f'{path}.tmp'
+    try:
+        with pq.ParquetWriter(tmp_path, schema) as writer:
+            for part_path in part_paths:
+                writer.write_table(pq.read_table(part_path).cast(schema))
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+
+
+def merge_land_tables(snapshot_dir) -> pd.DataFrame:
+    """
+    Join the streamed land tables in memory. Unlike the streaming fetch this is not bounded by a chunk:
+    it is a trade-off with the pages, which hold the whole land table in memory anyway (memory mapped).
+    The join peaks at roughly twice the size of its inputs, inputs above max_land_merge_mb fail the refresh
+    (the current snapshot stays) instead of running the refresh worker out of memory.
+    """
+    paths = [os.path.join(snapshot_dir, f'{name}.parquet') for name in STREAMED_TABLES]
+    input_mb = sum(get_uncompressed_mb(path) for path in paths)
+    max_mb = st.secrets.get("settings", {}).get("max_land_merge_mb", DEFAULT_MAX_LAND_MERGE_MB)
+    if input_mb > max_mb:
+        raise ValueError(f'Land tables need {input_mb:.0f} MB in memory, more than max_land_merge_mb ({max_mb})')
+
+    log.info(f'Merging land tables ({input_mb:.0f} MB)')
+    deeds, worksite_details, staking_details = (
+        dtype_util.sort_categories(pd.read_parquet(path)) for path in paths
+    )
+    return merge_land_deed_with_details(deeds, worksite_details, staking_details)
+
+
+def get_uncompressed_mb(path) -> float:
+    metadata = pq.read_metadata(path)
+    return sum(metadata.row_group(index).total_byte_size for index in range(metadata.num_row_groups)) / 1024 ** 2
+
+
+def list_history_partitions(snapshot_dir, name) -> list[str]:
+    partition_dir = os.path.join(snapshot_dir, name)
+    if not os.path.isdir(partition_dir):
+        return []
+    return sorted(f.removesuffix('.parquet') for f in os.listdir(partition_dir) if f.endswith('.parquet'))
+
+
+def get_history_watermark(snapshot_dir, name) -> str | None:
+    """Return the latest date partition cached for a history table, None when nothing is cached yet."""
+    partitions = list_history_partitions(snapshot_dir, name)
+    return partitions[-1] if partitions else None
+
+
+def save_history_partitions(snapshot_dir, name, df):
+    """
+    Write (or overwrite) one parquet file per date, older partitions are left untouched.
+    Partitions are hard linked from the previous snapshot, so existing files are removed before writing.
+    """
+    if df.empty:
+        log.info(f'No new rows for {name}')
+        return dtype_util.create_memory_report(0, 0, 0)
+
+    partition_dir = os.path.join(snapshot_dir, name)
+    os.makedirs(partition_dir, exist_ok=True)
+    compact_df = dtype_util.compact_dataframe(name, df)
+    partition_keys = compact_df['date'].dt.strftime(PARTITION_DATE_FORMAT)
+    for partition, partition_df in compact_df.groupby(partition_keys):
+        log.info(f'Writing {name} partition {partition}')
+        path = os.path.join(partition_dir, f'{partition}.parquet')
+        if os.path.exists(path):
+            os.remove(path)
+        partition_df.to_parquet(path, index=False)
+    return dtype_util.create_memory_report(
+        df.index.size, dtype_util.memory_usage_mb(df), dtype_util.memory_usage_mb(compact_df))
+
+
+def save_memory_report(snapshot_dir, reports):
+    dtype_util.log_memory_report(reports)
+    with open(os.path.join(snapshot_dir, MEMORY_REPORT_FILE), 'w') as f:
+        json.dump(reports, f, indent=2)
+
+
+def save_manifest(snapshot_dir):
+    """Record the latest date of every history table, so "latest" reads go straight to one partition."""
+    manifest = {'latest_dates': {name: get_history_watermark(snapshot_dir, name) for name in HISTORY_TABLES}}
+    with open(os.path.join(snapshot_dir, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def load_manifest(snapshot_dir) -> dict:
+    manifest_path = os.path.join(snapshot_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, 'r') as f:
+        return json.load(f)
+
+
+def get_latest_date(snapshot_dir, name) -> str | None:
+    latest_date = load_manifest(snapshot_dir).get('latest_dates', {}).get(name)
+    # Snapshots written before the manifest existed, fall back to the partition listing
+    return latest_date or get_history_watermark(snapshot_dir, name)
+
+
+def save_last_updated(snapshot_dir, last_updated):
     if last_updated:
-        with open(TIMESTAMP_PATH, 'w') as f:
+        with open(os.path.join(snapshot_dir, TIMESTAMP_FILE), 'w') as f:
             f.write(last_updated.isoformat())
     else:
         log.error("Tried to write None as last_updated... skipping")
 
 
 def load_cached_last_updated() -> datetime | None:
-    if os.path.exists(TIMESTAMP_PATH):
-        with open(TIMESTAMP_PATH, 'r') as f:
+    snapshot_dir = snapshot_util.get_current_snapshot_dir()
+    if snapshot_dir is None:
+        return None
+
+    timestamp_path = os.path.join(snapshot_dir, TIMESTAMP_FILE)
+    if os.path.exists(timestamp_path):
+        with open(timestamp_path, 'r') as f:
             value = f.readline().strip()
             try:
                 return datetime.fromisoformat(value)
             except Exception as e:
-                log.error(f"Invalid timestamp format in {TIMESTAMP_PATH}: {e}")
+                log.error(f"Invalid timestamp format in {timestamp_path}: {e}")
                 return None
     return None
 
 
-@st.cache_data(ttl='1h')
+def load_memory_report() -> pd.DataFrame:
+    """Memory per table before and after compaction, as measured by the refresh that wrote the current snapshot."""
+    snapshot_dir = snapshot_util.get_current_snapshot_dir()
+    report_path = os.path.join(snapshot_dir, MEMORY_REPORT_FILE) if snapshot_dir else None
+    if not report_path or not os.path.exists(report_path):
+        return pd.DataFrame()
+    with open(report_path, 'r') as f:
+        report = pd.DataFrame.from_dict(json.load(f), orient='index')
+    report['saved_mb'] = report['original_mb'] - report['compact_mb']
+    return report
+
+
 def load_cached_data(name):
-    path = os.path.join(DATA_BASE_DIR, f'{name}.parquet')
+    version = snapshot_util.get_current_version()
+    if version is None:
+        log.warning(f'No snapshot available yet for: {name}')
+        return pd.DataFrame()
+    return load_snapshot_table(version, name)
+
+
+def load_snapshot_table(version, name):
+    return get_snapshot_store().get(version, name)
+
+
+def load_derived(version, key, builder):
+    """Build something from a snapshot once (e.g. an index), it is shared until a newer snapshot is loaded."""
+    return get_snapshot_store().get_derived(version, key, builder)
+
+
+def load_latest_cached_data(name):
+    """Rows of the latest date of a history table, reads a single partition however long the history is."""
+    return load_cached_data(f'{name}{LATEST_SUFFIX}')
+
+
+@st.cache_resource
+def get_snapshot_store() -> SnapshotStore:
+    # One store per process, every session reads the same (read-only) tables
+    return SnapshotStore(read_snapshot_table, snapshot_util.get_current_version)
+
+
+def read_snapshot_table(version, name) -> pd.DataFrame:
+    snapshot_dir = snapshot_util.get_snapshot_dir(version)
+    if name.endswith(LATEST_SUFFIX):
+        return read_latest_partition(snapshot_dir, name.removesuffix(LATEST_SUFFIX))
+
+    partition_dir = os.path.join(snapshot_dir, name)
+    if os.path.isdir(partition_dir):
+        return read_partitions(partition_dir)
+
+    arrow_path = os.path.join(snapshot_dir, f'{name}.arrow')
+    if os.path.exists(arrow_path):
+        # Memory mapped, numeric columns without nulls stay views on the file instead of being copied
+        table = feather.read_table(arrow_path, memory_map=True)
+        return dtype_util.sort_categories(table.to_pandas(split_blocks=True))
+
+    path = os.path.join(snapshot_dir, f'{name}.parquet')
     if os.path.exists(path):
-        return pd.read_parquet(path)
+        return dtype_util.sort_categories(pd.read_parquet(path))
     log.warning(f'Missing cache: {path}')
     return pd.DataFrame()
+
+
+def read_latest_partition(snapshot_dir, name) -> pd.DataFrame:
+    latest_date = get_latest_date(snapshot_dir, name)
+    if latest_date is None:
+        log.warning(f'No partitions cached for: {name}')
+        return pd.DataFrame()
+    df = pd.read_parquet(os.path.join(snapshot_dir, name, f'{latest_date}.parquet'))
+    # Partitions carried over from before the dtype compaction still hold plain dates
+    return dtype_util.apply_schema(name, df)
+
+
+def read_partitions(partition_dir) -> pd.DataFrame:
+    # Each partition is downcast on its own, widen to a type that fits all of them
+    fragments = ds.dataset(partition_dir, format='parquet').get_fragments()
+    schema = pa.unify_schemas([fragment.physical_schema for fragment in fragments], promote_options='permissive')
+    dataset = ds.dataset(partition_dir, format='parquet', schema=schema)
+    return dtype_util.sort_categories(dataset.to_table().to_pandas())
@@ -5,6 +5,9 @@ from pathlib import Path
 import pandas as pd
 import streamlit as st
 
+from src.api import spl
+from src.pages.components import filter_section
+from src.utils import data_loader_new
 from src.utils.log_util import configure_logger
 
 db_url = st.secrets["database"]["url"]
@@ -31,6 +34,10 @@ def show_memory_output(placeholder):
             current, peak = tracemalloc.get_traced_memory()
             st.write(f"Current memory usage: {current / 1024 / 1024:.2f} MB")
             st.write(f"Peak memory usage: {peak / 1024 / 1024:.2f} MB")
+            st.write("Cached tables (MB):")
+            st.dataframe(data_loader_new.load_memory_report())
+            st.write("Filter cache:", filter_section.get_filter_result_cache().get_stats())
+            st.write("Player land cache:", spl.get_player_land_cache().get_stats())
 
         with placeholder.container():
             if st.secrets.get("settings", {}).get("debug_snapshot", False):
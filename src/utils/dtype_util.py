@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from src.utils.log_util import configure_logger
+
+log = configure_logger(__name__)
+
+# Low cardinality strings repeated on every deed, stored as categoricals (dictionary encoded in parquet)
+LAND_CATEGORY_COLUMNS = ['player', 'region_uid', 'token_symbol', 'rarity', 'deed_type', 'plot_status', 'worksite_type']
+
+# Per table: columns stored as categoricals and columns stored as timestamps, numerics are always downcast
+TABLE_SCHEMAS = {
+    'deed': {'category': LAND_CATEGORY_COLUMNS},
+    'worksite_detail': {'category': LAND_CATEGORY_COLUMNS},
+    'staking_detail': {'category': LAND_CATEGORY_COLUMNS},
+    'land': {'category': LAND_CATEGORY_COLUMNS},
+    'player_production_summary': {'category': ['player']},
+    'active': {'datetime': ['date']},
+    'resource_hub_metrics': {'datetime': ['date']},
+    'resource_supply': {'datetime': ['date']},
+    'resource_tracking': {'datetime': ['date']},
+}
+
+
+def apply_schema(name, df) -> pd.DataFrame:
+    """Convert the string and date columns of a table as configured in TABLE_SCHEMAS."""
+    schema = TABLE_SCHEMAS.get(name, {})
+    df = df.copy(deep=False)
+    for column in schema.get('category', []):
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype('category')
+    for column in schema.get('datetime', []):
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column])
+    return df
+
+
+def get_compact_numeric_types(df) -> dict:
+    """Smallest dtype per numeric column that still holds every value exactly."""
+    types = {}
+    for column in df.columns:
+        series = df[column]
+        if not isinstance(series.dtype, np.dtype) or pd.api.types.is_bool_dtype(series):
+            continue
+        if pd.api.types.is_integer_dtype(series):
+            types[column] = pd.to_numeric(series, downcast='integer').dtype
+        elif pd.api.types.is_float_dtype(series):
+            with np.errstate(over='ignore', invalid='ignore'):
+                as_float32 = series.to_numpy().astype(np.float32)
+            lossless = np.array_equal(as_float32, series.to_numpy(), equal_nan=True)
+            types[column] = np.dtype(np.float32) if lossless else series.dtype
+    return types
+
+
+def merge_numeric_types(types, other) -> dict:
+    """Combine the compact types of two chunks of the same table, the widest type wins."""
+    return {column: np.promote_types(types.get(column, dtype), dtype) for column, dtype in other.items()}
+
+
+def compact_dataframe(name, df) -> pd.DataFrame:
+    df = apply_schema(name, df)
+    return df.astype(get_compact_numeric_types(df))
+
+
+def compact_arrow_schema(schema, numeric_types) -> pa.Schema:
+    fields = []
+    for field in schema:
+        is_numeric = pa.types.is_integer(field.type) or pa.types.is_floating(field.type)
+        if is_numeric and field.name in numeric_types:
+            field = field.with_type(pa.from_numpy_dtype(numeric_types[field.name]))
+        fields.append(field)
+    return pa.schema(fields, metadata=schema.metadata)
+
+
+def sort_categories(df) -> pd.DataFrame:
+    """Categories unified over several row groups keep their order of appearance, sort them alphabetically."""
+    for column in df.select_dtypes('category').columns:
+        categories = df[column].cat.categories
+        if not categories.is_monotonic_increasing:
+            df[column] = df[column].cat.reorder_categories(categories.sort_values())
+    return df
+
+
+def memory_usage_mb(df) -> float:
+    return df.memory_usage(deep=True).sum() / 1024 / 1024
+
+
+def create_memory_report(rows, original_mb, compact_mb) -> dict:
+    return {'rows': int(rows), 'original_mb': round(float(original_mb), 2), 'compact_mb': round(float(compact_mb), 2)}
+
+
+def log_memory_report(report):
+    for name, entry in report.items():
+        saved = entry['original_mb'] - entry['compact_mb']
+        percentage = saved / entry['original_mb'] * 100 if entry['original_mb'] else 0
+        log.info(f"{name}: {entry['rows']} rows, {entry['original_mb']:.2f} MB -> {entry['compact_mb']:.2f} MB "
+                 f"(saved {saved:.2f} MB, {percentage:.0f}%)")
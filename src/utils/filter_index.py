@@ -0,0 +1,114 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from src.utils.log_util import configure_logger
+
+log = configure_logger(__name__)
+
+
+class FilterIndex:
+    """
+    Integer codes per filterable column of a snapshot table, built once per snapshot.
+    A filter selection becomes a lookup per column and a few vectorized ANDs,
+    the frame itself is only touched by a single take.
+    """
+
+    def __init__(self, df, columns, flags=None):
+        """
+        :param columns: columns filtered by value.
+        :param flags: name -> function(df) returning a boolean Series, for the yes/no filters.
+        """
+        self.size = len(df)
+        self.version = df.attrs.get('snapshot_version')
+        self.codes = {}
+        self.values = {}
+        self.options = {}
+        for column in columns:
+            if column in df.columns:
+                # Sorted values, missing values get code -1
+                self.codes[column], self.values[column] = pd.factorize(df[column], sort=True)
+                self.options[column] = self.values[column].tolist()
+        self.flags = {name: build(df).to_numpy(dtype=bool) for name, build in (flags or {}).items()}
+        log.info(f'Built filter index for {self.size} rows of snapshot {self.version}')
+
+    def matches(self, df) -> bool:
+        """The index only applies to the (unfiltered) snapshot frame it was built from."""
+        return df.attrs.get('snapshot_version') == self.version and len(df) == self.size
+
+    def value_mask(self, column, values) -> np.ndarray:
+        positions = self.values[column].get_indexer(values)
+        # One extra slot at the end that stays False, rows with a missing value (code -1) land on it
+        selected = np.zeros(len(self.values[column]) + 1, dtype=bool)
+        selected[positions[positions >= 0]] = True
+        return selected[self.codes[column]]
+
+    def mask(self, selections, flags=()) -> np.ndarray:
+        """
+        :param selections: column -> selected values, rows need one of the values for every column.
+        :param flags: names of flags that must be set.
+        """
+        mask = np.ones(self.size, dtype=bool)
+        for column, values in selections.items():
+            if values and column in self.codes:
+                mask &= self.value_mask(column, values)
+        for flag in flags:
+            mask &= self.flags[flag]
+        return mask
+
+    def facet_counts(self, column, selections, flags=()) -> np.ndarray:
+        """Number of matching rows per value of column (in the order of options), for the given selection."""
+        codes = self.codes[column][self.mask(selections, flags)]
+        return np.bincount(codes[codes >= 0], minlength=len(self.values[column]))
+
+
+class FilterResultCache:
+    """
+    LRU cache of filtered row positions, keyed by (snapshot version, table, normalized filter state).
+    Shared by every session, so popular selections (e.g. a single region) are a dictionary lookup.
+    Bounded by the total size of the cached row arrays and the number of entries.
+    """
+
+    def __init__(self, max_bytes, max_entries):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_rows(self, key, compute) -> np.ndarray:
+        with self._lock:
+            rows = self._entries.get(key)
+            if rows is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return rows
+            self.misses += 1
+
+        # Computed outside the lock, two sessions asking the same key at once both compute it
+        rows = compute().astype(np.int32)
+        rows.flags.writeable = False
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = rows
+                self.bytes += rows.nbytes
+                self._evict()
+        return rows
+
+    def _evict(self):
+        while len(self._entries) > 1 and (self.bytes > self.max_bytes or len(self._entries) > self.max_entries):
+            _, rows = self._entries.popitem(last=False)
+            self.bytes -= rows.nbytes
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'size_mb': round(self.bytes / 1024 / 1024, 2),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
@@ -0,0 +1,50 @@
+import pandas as pd
+
+from src.utils.log_util import configure_logger
+
+log = configure_logger(__name__)
+
+DETAIL_SUFFIXES = ('_worksite_details', '_staking_details')
+
+
+def merge_land_deed_with_details(deeds, worksite_details, staking_details):
+    df = pd.merge(
+        deeds,
+        worksite_details,
+        how='left',
+        on='deed_uid',
+        suffixes=('', DETAIL_SUFFIXES[0])
+    )
+    df = pd.merge(
+        df,
+        staking_details,
+        how='left',
+        on='deed_uid',
+        suffixes=('', DETAIL_SUFFIXES[1])
+    )
+    df = resolve_duplicate_columns(df)
+    return df.reindex(sorted(df.columns), axis=1)
+
+
+def resolve_duplicate_columns(df):
+    """
+    Drop the suffixed copies the merge creates for columns present in more than one table,
+    only when they hold exactly the same values as the deed column. Differing columns are kept.
+    """
+    matching_columns = df.columns[df.columns.str.endswith(DETAIL_SUFFIXES)].tolist()
+    duplicates = []
+    for column in matching_columns:
+        base_column = column.removesuffix(DETAIL_SUFFIXES[0]).removesuffix(DETAIL_SUFFIXES[1])
+        if base_column in df.columns and is_same_column(df[base_column], df[column]):
+            duplicates.append(column)
+
+    kept = [column for column in matching_columns if column not in duplicates]
+    log.debug(f'Dropped duplicate columns: {duplicates}, reminder watch these columns: {kept}')
+    return df.drop(columns=duplicates)
+
+
+def is_same_column(left, right) -> bool:
+    # Compare as objects, categoricals with different categories and int/float columns can't be compared directly
+    left = left.astype(object)
+    right = right.astype(object)
+    return bool(((left == right) | (left.isna() & right.isna())).all())
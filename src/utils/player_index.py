@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+# Sorts after every other character, prefix + this is the end of the prefix range
+_MAX_CHAR = chr(0x10FFFF)
+
+
+class PlayerIndex:
+    """
+    Distinct player names sorted by their lowercase name, for case-insensitive exact and prefix lookups
+    with a binary search instead of lowercasing and comparing the whole column.
+    """
+
+    def __init__(self, players):
+        players = pd.Series(players).dropna()
+        first = players[~players.duplicated()]
+        keys = first.astype(str).str.lower().to_numpy(dtype=str)
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.names = first.astype(str).to_numpy(dtype=object)[order]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _position(self, name) -> int | None:
+        key = str(name).strip().lower()
+        position = np.searchsorted(self.keys, key)
+        if position < len(self.keys) and self.keys[position] == key:
+            return int(position)
+        return None
+
+    def search(self, prefix, limit=20) -> list[str]:
+        """Player names starting with prefix (ignoring case), at most limit in alphabetical order."""
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        start = np.searchsorted(self.keys, prefix, side='left')
+        end = np.searchsorted(self.keys, prefix + _MAX_CHAR, side='left')
+        return self.names[start:min(end, start + limit)].tolist()
+
+    def get_name(self, name) -> str | None:
+        """The player name as stored, for a name entered in any case."""
+        position = self._position(name)
+        return None if position is None else self.names[position]
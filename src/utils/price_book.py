@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+# 40 aura is needed to make one midnight potion
+AURA_PER_MIDNIGHT_POTION = 40
+MIDNIGHT_POTION_DETAIL_ID = 'MIDNIGHTPOT'
+
+
+class PriceBook:
+    """
+    The prices of one price fetch, indexed once: DEC price per land resource token, the DEC and SPS USD rates
+    and the minimum market price (USD) per item. Converts amounts of any token to DEC, per value or per column.
+    """
+
+    def __init__(self, resource_pools_df, prices_df, item_prices=None):
+        """
+        :param resource_pools_df: land liquidity pools (token_symbol, dec_price).
+        :param prices_df: USD prices of one fetch (dec, sps).
+        :param item_prices: item detailId -> minimum USD price, None when the item has no valid price.
+        """
+        if resource_pools_df.empty:
+            self.dec_prices = pd.Series(dtype=float)
+        else:
+            # First pool of a token, as the lookups by token_symbol used to take
+            pools = resource_pools_df.drop_duplicates('token_symbol')
+            self.dec_prices = pd.Series(pools['dec_price'].to_numpy(dtype=float), index=pools['token_symbol'])
+        self.dec_usd = float(prices_df['dec'].values[0]) if 'dec' in prices_df.columns else None
+        self.sps_usd = float(prices_df['sps'].values[0]) if 'sps' in prices_df.columns else None
+        self.item_prices = item_prices or {}
+
+    def is_available(self) -> bool:
+        return not self.dec_prices.empty and self.dec_usd is not None and self.sps_usd is not None
+
+    def get_dec_price(self, token) -> float:
+        """Amount of the token one DEC buys in the pool."""
+        return self.dec_prices[token]
+
+    def get_item_price(self, detail_id) -> float | None:
+        return self.item_prices.get(detail_id)
+
+    def to_dec(self, tokens, amounts) -> np.ndarray:
+        """DEC value of amounts of tokens, for whole columns at once. Unknown tokens give NaN."""
+        tokens = np.asarray(tokens, dtype=object)
+        amounts = np.asarray(amounts, dtype=float)
+        dec = amounts / self.dec_prices.reindex(tokens).to_numpy(dtype=float)
+
+        dec = np.where(tokens == 'RESEARCH', 0.0, dec)
+        is_sps = tokens == 'SPS'
+        if is_sps.any():
+            dec = np.where(is_sps, amounts * self.sps_usd / self.dec_usd, dec)
+        is_aura = tokens == 'AURA'
+        if is_aura.any():
+            usd_price = self.get_item_price(MIDNIGHT_POTION_DETAIL_ID)
+            if usd_price:
+                aura_dec = (amounts / AURA_PER_MIDNIGHT_POTION) * usd_price / self.dec_usd
+            else:
+                aura_dec = 0.0
+            dec = np.where(is_aura, aura_dec, dec)
+        return dec
+
+    def to_dec_value(self, token, amount) -> float:
+        return float(self.to_dec([token], [amount])[0])
@@ -0,0 +1,70 @@
+import os
+import threading
+
+import pandas as pd
+import streamlit as st
+
+from src.utils import snapshot_util
+from src.utils.log_util import configure_logger
+
+try:
+    import duckdb
+except ImportError:  # optional, pages fall back to pandas
+    duckdb = None
+
+log = configure_logger(__name__)
+
+
+def is_enabled() -> bool:
+    return duckdb is not None and st.secrets.get("settings", {}).get("duckdb_queries", True)
+
+
+class SnapshotConnection:
+    """In-memory database with views on the tables of one snapshot, every query runs on its own cursor."""
+
+    def __init__(self):
+        self.connection = duckdb.connect()
+        self.version = None
+        self._lock = threading.Lock()
+
+    def cursor(self, version):
+        """Cursor on the given snapshot, the views are moved to it first when they point to another one."""
+        with self._lock:
+            if version != self.version:
+                create_views(self.connection, version)
+                self.version = version
+        return self.connection.cursor()
+
+
+@st.cache_resource
+def get_connection() -> SnapshotConnection:
+    # One per process, shared by every session
+    return SnapshotConnection()
+
+
+def create_views(connection, version):
+    """Expose every table of a snapshot as a view on its parquet file(s)."""
+    snapshot_dir = snapshot_util.get_snapshot_dir(version)
+    for entry in sorted(os.listdir(snapshot_dir)):
+        path = os.path.join(snapshot_dir, entry)
+        if os.path.isdir(path):
+            name, source = entry, f"read_parquet('{path}/*.parquet', union_by_name = true)"
+        elif entry.endswith('.parquet'):
+            name, source = entry.removesuffix('.parquet'), f"read_parquet('{path}')"
+        else:
+            continue
+        connection.execute(f'CREATE OR REPLACE VIEW "{name}" AS SELECT * FROM {source}')
+    log.info(f'Query engine views point to snapshot {version}')
+
+
+def query(sql, params=None) -> pd.DataFrame:
+    """Run SQL against the tables of the current snapshot, only the result rows are loaded into pandas."""
+    version = snapshot_util.get_current_version()
+    if version is None:
+        return pd.DataFrame()
+
+    cursor = get_connection().cursor(version)
+    try:
+        return cursor.execute(sql, params or []).fetch_arrow_table().to_pandas()
+    finally:
+        cursor.close()
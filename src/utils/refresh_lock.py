@@ -0,0 +1,270 @@
+import fcntl
+import json
+import os
+import socket
+import threading
+import time
+
+import streamlit as st
+from sqlalchemy import text
+
+from src.api.db.session import get_engine
+from src.utils.log_util import configure_logger
+from src.utils.snapshot_util import DATA_BASE_DIR
+
+log = configure_logger(__name__)
+
+LOCK_FILE = os.path.join(DATA_BASE_DIR, 'refresh.lock')
+HEARTBEAT_FILE = os.path.join(DATA_BASE_DIR, 'refresh.heartbeat')
+
+# Postgres advisory lock key shared by all replicas ('SPLL')
+ADVISORY_LOCK_KEY = int.from_bytes(b'SPLL', 'big')
+
+HEARTBEAT_INTERVAL = 10  # seconds
+# Without a heartbeat for this long the refresh is no longer shown as running (its holder died)
+STALE_AFTER = 5 * 60  # seconds
+# A holder gives the lock up after this long, so a hung refresh never blocks the next one.
+# Refreshes are bounded well below this (REFRESH_TIMEOUT), a refresh that still runs may no longer publish
+MAX_HOLD_SECONDS = 60 * 60
+
+
+class LockMetrics:
+    """Lock wait/hold counters of this process, kept in a cache_resource so reruns and reloads don't reset them."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.values = {
+            'attempts': 0,
+            'acquired': 0,
+            'contended': 0,
+            'takeovers': 0,
+            'expired': 0,
+            'total_wait_seconds': 0.0,
+            'last_wait_seconds': 0.0,
+            'last_held_seconds': 0.0,
+        }
+
+    def add(self, **increments):
+        with self._lock:
+            for key, value in increments.items():
+                self.values[key] += value
+
+    def set(self, **values):
+        with self._lock:
+            self.values.update(values)
+
+    def get(self) -> dict:
+        with self._lock:
+            return dict(self.values)
+
+
+@st.cache_resource
+def get_metrics() -> LockMetrics:
+    return LockMetrics()
+
+
+def use_postgres_lock() -> bool:
+    return st.secrets.get("settings", {}).get("distributed_refresh_lock", True)
+
+
+def get_lock_metrics() -> dict:
+    return get_metrics().get()
+
+
+def read_heartbeat() -> dict | None:
+    try:
+        with open(HEARTBEAT_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def is_owner_alive(owner) -> bool:
+    """Whether the process owner ('host:pid') still runs. Processes on other hosts are assumed alive."""
+    host, _, pid = (owner or '').rpartition(':')
+    if host != socket.gethostname() or not pid.isdigit():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def is_refresh_running() -> bool:
+    """A refresh is running (on any replica sharing the data volume) when its heartbeat is fresh."""
+    heartbeat = read_heartbeat()
+    if not heartbeat or not is_owner_alive(heartbeat.get('owner')):
+        return False
+    return time.time() - heartbeat.get('heartbeat_at', 0) < STALE_AFTER
+
+
+class RefreshLock:
+    """
+    Makes sure exactly one refresh runs cluster-wide.
+
+    - An OS advisory lock (flock) on the data volume, released by the kernel when the holder dies.
+    - A Postgres advisory lock for replicas that do not share a host, released when the connection drops.
+    - A heartbeat file while the lock is held, so pages can show a refresh is running.
+
+    The lock is only ever taken when both are free: a previous holder is replaced once it is dead
+    or once it has held the lock for MAX_HOLD_SECONDS, after which it releases both locks itself.
+    A refresh checks is_held() before publishing, so an expired holder never publishes over its successor.
+    """
+
+    def __init__(self, use_postgres=None):
+        self.use_postgres = use_postgres_lock() if use_postgres is None else use_postgres
+        self.owner = f'{socket.gethostname()}:{os.getpid()}'
+        self.acquired_at = None
+        self.expired = False
+        self._lock_fd = None
+        self._pg_connection = None
+        self._stop_heartbeat = threading.Event()
+        self._heartbeat_thread = None
+
+    def acquire(self, timeout=0, poll_interval=1) -> bool:
+        """Try to take the lock, waiting up to timeout seconds. Returns True when the lock is held."""
+        start_time = time.time()
+        metrics = get_metrics()
+        metrics.add(attempts=1)
+        while True:
+            if self._try_acquire():
+                wait = time.time() - start_time
+                metrics.add(acquired=1, total_wait_seconds=wait)
+                metrics.set(last_wait_seconds=wait)
+                self._log_takeover()
+                log.info(f'Refresh lock acquired by {self.owner} after waiting {wait:.2f} seconds')
+                self.acquired_at = time.time()
+                self.expired = False
+                self._write_heartbeat()
+                self._start_heartbeat()
+                return True
+            if time.time() - start_time >= timeout:
+                metrics.add(contended=1, total_wait_seconds=time.time() - start_time)
+                return False
+            time.sleep(poll_interval)
+
+    def is_held(self) -> bool:
+        return self.acquired_at is not None and not self.expired
+
+    def release(self):
+        self._stop_heartbeat.set()
+        if self._heartbeat_thread:
+            self._heartbeat_thread.join()
+        self._release_locks()
+        self.acquired_at = None
+
+    def _release_locks(self):
+        if self.acquired_at and not self.expired:
+            held = time.time() - self.acquired_at
+            get_metrics().set(last_held_seconds=held)
+            log.info(f'Refresh lock released by {self.owner} after {held:.2f} seconds')
+            heartbeat = read_heartbeat()
+            if heartbeat and heartbeat.get('owner') == self.owner:
+                os.remove(HEARTBEAT_FILE)
+        self._release_postgres()
+        self._release_file()
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def _try_acquire(self) -> bool:
+        if not self._acquire_file():
+            return False
+        if not self.use_postgres:
+            return True
+        try:
+            acquired = self._acquire_postgres()
+        except Exception as e:
+            # Never keep the flock without the advisory lock, later attempts in this process would all fail
+            log.warning(f'Unable to take the postgres refresh lock: {e}')
+            acquired = False
+        if not acquired:
+            self._release_file()
+        return acquired
+
+    def _log_takeover(self):
+        # Both locks are free, so a heartbeat of another owner is left behind by a holder that died
+        heartbeat = read_heartbeat()
+        if heartbeat and heartbeat.get('owner') != self.owner:
+            log.warning(f'Refresh lock taken over from {heartbeat.get("owner")}, which died while refreshing')
+            get_metrics().add(takeovers=1)
+
+    def _acquire_file(self) -> bool:
+        os.makedirs(DATA_BASE_DIR, exist_ok=True)
+        fd = os.open(LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, self.owner.encode())
+        self._lock_fd = fd
+        return True
+
+    def _release_file(self):
+        if self._lock_fd is not None:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def _acquire_postgres(self) -> bool:
+        connection = get_engine().connect()
+        try:
+            acquired = self._try_advisory_lock(connection)
+        except Exception:
+            connection.close()
+            raise
+
+        if not acquired:
+            connection.close()
+            return False
+        self._pg_connection = connection
+        return True
+
+    @staticmethod
+    def _try_advisory_lock(connection) -> bool:
+        # Session level lock, it outlives the transaction and is dropped with the connection
+        acquired = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {'key': ADVISORY_LOCK_KEY}).scalar()
+        connection.commit()
+        return bool(acquired)
+
+    def _release_postgres(self):
+        if self._pg_connection is None:
+            return
+        try:
+            self._pg_connection.execute(text("SELECT pg_advisory_unlock(:key)"), {'key': ADVISORY_LOCK_KEY})
+            self._pg_connection.commit()
+            self._pg_connection.close()
+        except Exception as e:
+            # Dropping the connection releases the lock as well
+            log.warning(f'Unable to release postgres refresh lock cleanly: {e}')
+            self._pg_connection.invalidate()
+        self._pg_connection = None
+
+    def _start_heartbeat(self):
+        self._stop_heartbeat.clear()
+        self._heartbeat_thread = threading.Thread(target=self._heartbeat, name="refresh-lock-heartbeat", daemon=True)
+        self._heartbeat_thread.start()
+
+    def _heartbeat(self):
+        while not self._stop_heartbeat.wait(HEARTBEAT_INTERVAL):
+            if time.time() - self.acquired_at > MAX_HOLD_SECONDS:
+                log.error(f'Refresh lock held for more than {MAX_HOLD_SECONDS} seconds, handing it over')
+                self._release_locks()
+                self.expired = True
+                get_metrics().add(expired=1)
+                return
+            self._write_heartbeat()
+
+    def _write_heartbeat(self):
+        tmp_path = f'{HEARTBEAT_FILE}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'owner': self.owner, 'acquired_at': self.acquired_at, 'heartbeat_at': time.time()}, f)
+        os.replace(tmp_path, HEARTBEAT_FILE)
@@ -0,0 +1,75 @@
+import threading
+import time
+
+import streamlit as st
+
+from src.utils import data_loader_new
+from src.utils.log_util import configure_logger
+
+log = configure_logger(__name__)
+
+DEFAULT_POLL_INTERVAL = 5 * 60  # seconds between checks of the database last_update timestamp
+
+
+def get_poll_interval() -> int:
+    return st.secrets.get("settings", {}).get("refresh_poll_seconds", DEFAULT_POLL_INTERVAL)
+
+
+def is_external_worker() -> bool:
+    """When the refresh runs as its own process (python -m src.utils.refresh_worker) the app does not start one."""
+    return st.secrets.get("settings", {}).get("external_refresh_worker", False)
+
+
+class RefreshWorker:
+    """
+    Polls the database on a schedule and refreshes the snapshot off the request path.
+    Page renders only read the latest published snapshot.
+    """
+
+    def __init__(self, poll_interval=DEFAULT_POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self.last_check = None
+        self.last_error = None
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self.run, name="refresh-worker", daemon=True)
+
+    def start(self):
+        log.info(f"Starting refresh worker, polling every {self.poll_interval} seconds")
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.check_and_refresh()
+            self._stop_event.wait(self.poll_interval)
+
+    def check_and_refresh(self):
+        self.last_check = time.time()
+        try:
+            data_loader_new.safe_refresh_data()
+            self.last_error = None
+        except Exception as e:
+            # Never let the worker die, the next poll retries
+            self.last_error = str(e)
+            log.error(f"Background refresh failed: {e}")
+
+
+@st.cache_resource
+def get_refresh_worker() -> RefreshWorker | None:
+    """Start the refresh worker once per process, every session shares it."""
+    if is_external_worker():
+        log.info("Refresh worker runs as a separate process, not starting one in the app")
+        return None
+    worker = RefreshWorker(get_poll_interval())
+    worker.start()
+    return worker
+
+
+if __name__ == "__main__":
+    # Separate entry point: python -m src.utils.refresh_worker
+    RefreshWorker(get_poll_interval()).run()
@@ -1,26 +1,21 @@
+import numpy as np
 import pandas as pd
+import streamlit as st
 
 from src.api import spl
 from src.static.static_values_enum import consume_rates, CONSUMING_GRAIN_ONLY_RESOURCES, MULTIPLE_CONSUMING_RESOURCE, \
     NATURAL_RESOURCE, DEFAULT_ORDER_RESOURCES
+from src.utils.price_book import PriceBook
 
 
-def get_price(metrics_df, prices_df, token, amount) -> float:
-    if token == 'RESEARCH':
-        return 0
-    if token == "SPS":
-        usd_value = amount * prices_df['sps'].values[0]
-        dec_total = usd_value / prices_df['dec'].values[0]
-        return dec_total
-    if token == "AURA":
-        usd_price = spl.get_item_price('MIDNIGHTPOT')
-        if usd_price:
-            midnight_potions_value_usd = (amount / 40) * usd_price  # 40 aura is needed to make one midnight potion
-            dec_total = midnight_potions_value_usd / prices_df['dec'].values[0]
-            return dec_total
-        else:
-            return 0
-    return amount / metrics_df[metrics_df['token_symbol'] == token]['dec_price'].values[0]
+def get_price_book() -> PriceBook:
+    return build_price_book(spl.get_land_resources_pools(), spl.get_prices(), spl.get_item_min_prices())
+
+
+@st.cache_resource(max_entries=2)
+def build_price_book(resource_pools_df, prices_df, item_prices) -> PriceBook:
+    # Keyed by the (cached) fetch results, so the book is rebuilt only when a fetch returns new prices
+    return PriceBook(resource_pools_df, prices_df, item_prices)
 
 
 def reorder_column(df, column="token_symbol"):
@@ -30,15 +25,35 @@ def reorder_column(df, column="token_symbol"):
     return ordered_df
 
 
-def calc_costs(row):
-    resource = row["token_symbol"]
-    base = row["total_base_pp_after_cap"]
-    costs = {f'cost_per_h_{res.lower()}': 0 for res in NATURAL_RESOURCE}
+COST_COLUMNS = [f'cost_per_h_{res.lower()}' for res in NATURAL_RESOURCE]
+
+
+def get_consume_rate_matrix() -> pd.DataFrame:
+    """Natural resources (columns) consumed per base PP per hour by a plot producing a resource (index)."""
+    matrix = pd.DataFrame(0.0, index=CONSUMING_GRAIN_ONLY_RESOURCES + MULTIPLE_CONSUMING_RESOURCE,
+                          columns=NATURAL_RESOURCE)
+    matrix.loc[CONSUMING_GRAIN_ONLY_RESOURCES, 'GRAIN'] = consume_rates['GRAIN']
+    for dep in NATURAL_RESOURCE:
+        matrix.loc[MULTIPLE_CONSUMING_RESOURCE, dep] = consume_rates[dep]
+    return matrix
+
+
+CONSUME_RATE_MATRIX = get_consume_rate_matrix()
+
+
+def calc_costs(token_symbols, base_pp) -> pd.DataFrame:
+    """
+    cost_per_h_* columns for all plots at once, from their token_symbol and total_base_pp_after_cap.
+    Resources that are not produced from natural resources cost nothing.
+    """
+    token_symbols = pd.Series(token_symbols)
+    positions = CONSUME_RATE_MATRIX.index.get_indexer(token_symbols.astype(object))
+    # Unknown or missing symbols (-1) pick the extra row of zeros at the end
+    rates = np.vstack([CONSUME_RATE_MATRIX.to_numpy(), np.zeros(len(NATURAL_RESOURCE))])[positions]
+    base_pp = np.asarray(base_pp, dtype=float)[:, np.newaxis]
+    costs = np.where(rates != 0, rates * base_pp, 0.0)
+    return pd.DataFrame(costs, columns=COST_COLUMNS, index=token_symbols.index)
+
 
-    if resource in CONSUMING_GRAIN_ONLY_RESOURCES:
-        costs['cost_per_h_grain'] = base * consume_rates["GRAIN"]
-    elif resource in MULTIPLE_CONSUMING_RESOURCE:
-        for dep in NATURAL_RESOURCE:
-            key = f'cost_per_h_{dep.lower()}'
-            costs[key] = base * consume_rates[dep]
-    return pd.Series(costs)
+def add_costs(df) -> pd.DataFrame:
+    return pd.concat([df, calc_costs(df['token_symbol'], df['total_base_pp_after_cap'])], axis=1)
@@ -0,0 +1,76 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from src.utils.log_util import configure_logger
+
+log = configure_logger(__name__)
+
+
+def make_read_only(df) -> pd.DataFrame:
+    """Mark the arrays behind every column read-only, in place writes into shared data raise a ValueError."""
+    for column in df.columns:
+        values = df[column].array
+        values = values.codes if isinstance(values, pd.Categorical) else np.asarray(values)
+        # Views share the memory of their base, lock the whole chain
+        while isinstance(values, np.ndarray):
+            values.flags.writeable = False
+            values = values.base
+    return df
+
+
+class SnapshotStore:
+    """
+    Process-wide tables of the current snapshot, loaded once and shared by every session.
+    Callers get a shallow copy: adding or replacing columns only affects their own frame,
+    writing into the shared arrays raises. The store follows the version get_current_version points at
+    (not only newer ones), tables of the version it leaves are dropped.
+    Frames carry their version in df.attrs['snapshot_version'].
+    """
+
+    def __init__(self, loader, get_current_version=None):
+        self.loader = loader
+        self.get_current_version = get_current_version
+        self.version = None
+        self._tables = {}
+        self._derived = {}
+        self._lock = threading.RLock()
+
+    def get(self, version, name) -> pd.DataFrame:
+        with self._lock:
+            if self._is_outdated(version):
+                return self._load(version, name)
+            if name not in self._tables:
+                self._tables[name] = make_read_only(self._load(version, name))
+            return self._tables[name].copy(deep=False)
+
+    def get_derived(self, version, key, builder):
+        """
+        Something built from the tables of a snapshot (an index, lookup...), built once per version.
+        Whatever the builder returns is shared by every session and must be treated as read-only.
+        """
+        with self._lock:
+            if self._is_outdated(version):
+                return builder()
+            if key not in self._derived:
+                self._derived[key] = builder()
+            return self._derived[key]
+
+    def _is_outdated(self, version) -> bool:
+        if version == self.version:
+            return False
+        if self.version is not None and self.get_current_version is not None and \
+                version != self.get_current_version():
+            # A reader that resolved the pointer just before a publish, keep the current tables
+            return True
+        log.info(f'Snapshot store switching from {self.version} to {version}')
+        self.version = version
+        self._tables = {}
+        self._derived = {}
+        return False
+
+    def _load(self, version, name) -> pd.DataFrame:
+        df = self.loader(version, name)
+        df.attrs['snapshot_version'] = version
+        return df
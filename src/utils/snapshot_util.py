@@ -0,0 +1,125 @@
+import os
+import shutil
+from datetime import datetime, timezone
+
+from src.utils.log_util import configure_logger
+
+log = configure_logger(__name__)
+
+DATA_BASE_DIR = 'data'
+SNAPSHOT_BASE_DIR = os.path.join(DATA_BASE_DIR, 'snapshots')
+CURRENT_POINTER_PATH = os.path.join(DATA_BASE_DIR, 'CURRENT')
+
+# Number of published snapshots kept on disk (current one included), pages still reading an older one can finish
+SNAPSHOTS_TO_KEEP = 3
+VERSION_FORMAT = '%Y%m%dT%H%M%S'
+# Written when a refresh has saved every table, snapshots without it are unfinished (or crashed)
+MANIFEST_FILE = 'manifest.json'
+
+
+def get_snapshot_dir(version) -> str:
+    return os.path.join(SNAPSHOT_BASE_DIR, version)
+
+
+def list_versions() -> list[str]:
+    if not os.path.isdir(SNAPSHOT_BASE_DIR):
+        return []
+    return sorted(v for v in os.listdir(SNAPSHOT_BASE_DIR) if os.path.isdir(get_snapshot_dir(v)))
+
+
+def is_complete(version) -> bool:
+    return os.path.exists(os.path.join(get_snapshot_dir(version), MANIFEST_FILE))
+
+
+def get_current_version() -> str | None:
+    """Resolve the "current" pointer, readers only ever see fully written snapshots through this."""
+    if not os.path.exists(CURRENT_POINTER_PATH):
+        return None
+    with open(CURRENT_POINTER_PATH, 'r') as f:
+        version = f.readline().strip()
+    if not version or not os.path.isdir(get_snapshot_dir(version)):
+        log.error(f"Current snapshot pointer is invalid: '{version}'")
+        return None
+    return version
+
+
+def get_current_snapshot_dir() -> str | None:
+    version = get_current_version()
+    return get_snapshot_dir(version) if version else None
+
+
+def create_snapshot() -> str:
+    """Create an empty snapshot directory for a new refresh and return its version."""
+    base_version = datetime.now(timezone.utc).strftime(VERSION_FORMAT)
+    version = base_version
+    suffix = 0
+    while True:
+        try:
+            os.makedirs(get_snapshot_dir(version))
+            return version
+        except FileExistsError:
+            # Another refresh within the same second (e.g. a retry), the suffix keeps versions sorted
+            suffix += 1
+            version = f'{base_version}-{suffix:02d}'
+
+
+def link_or_copy(src, dst):
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def seed_snapshot(version, previous_version, names):
+    """
+    Carry entries (files or directories) over from a previous snapshot using hard links,
+    so incremental tables only need to write what changed.
+    Hard linked files must be removed before they are rewritten, never truncated in place.
+    """
+    if not previous_version:
+        return
+    for name in names:
+        src = os.path.join(get_snapshot_dir(previous_version), name)
+        dst = os.path.join(get_snapshot_dir(version), name)
+        if os.path.isdir(src):
+            shutil.copytree(src, dst, copy_function=link_or_copy)
+        elif os.path.isfile(src):
+            link_or_copy(src, dst)
+
+
+def set_current_version(version):
+    # Write the pointer next to the real one and rename, so the swap is atomic for readers
+    tmp_path = f'{CURRENT_POINTER_PATH}.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(f'{version}\n')
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, CURRENT_POINTER_PATH)
+
+
+def publish_snapshot(version):
+    set_current_version(version)
+    log.info(f'Published snapshot {version}')
+    prune_snapshots()
+
+
+def discard_snapshot(version):
+    log.warning(f'Discarding snapshot {version}')
+    shutil.rmtree(get_snapshot_dir(version), ignore_errors=True)
+
+
+def prune_snapshots(keep=SNAPSHOTS_TO_KEEP):
+    """
+    Remove everything except the current snapshot and the completed ones right before it.
+    Unfinished snapshots left by crashed refreshes don't count towards keep and are removed as well.
+    """
+    current = get_current_version()
+    if not current:
+        return
+    versions = list_versions()
+    older = [v for v in versions if v < current and is_complete(v)]
+    keep_versions = older[max(len(older) - keep + 1, 0):] + [current]
+    for version in versions:
+        if version not in keep_versions:
+            log.info(f'Removing old snapshot {version}')
+            shutil.rmtree(get_snapshot_dir(version), ignore_errors=True)
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+
+class SortIndex:
+    """
+    Sort permutations of a frame, built once per dataset (e.g. the fetched deeds of a player).
+    Sorting a filtered view is a take of the presorted positions that are in the filtered rows.
+    Sorts are stable and put missing values last, in both directions.
+    """
+
+    def __init__(self, df, columns, key_column=None):
+        """
+        :param columns: sortable columns, missing ones are skipped.
+        :param key_column: column identifying the rows, used to notice a refetched dataset that changed.
+        """
+        self.size = len(df)
+        self.version = df.attrs.get('snapshot_version')
+        self.key_column = key_column
+        self.keys = df[key_column].to_numpy() if key_column else None
+        self.ranks = {}
+        for column in columns:
+            if column in df.columns and column not in self.ranks:
+                codes, uniques = pd.factorize(df[column], sort=True)
+                self.ranks[column] = (codes, len(uniques))
+        self._orders = {}
+
+    def matches(self, df) -> bool:
+        if len(df) != self.size or df.attrs.get('snapshot_version') != self.version:
+            return False
+        return self.key_column is None or np.array_equal(self.keys, df[self.key_column].to_numpy())
+
+    def has_columns(self, columns) -> bool:
+        return all(column in self.ranks for column in columns)
+
+    def _rank(self, column, ascending) -> np.ndarray:
+        codes, count = self.ranks[column]
+        # Missing values (code -1) rank after every value
+        return np.where(codes < 0, count, codes if ascending else count - 1 - codes)
+
+    def order(self, columns, ascending=True) -> np.ndarray:
+        """Row positions sorted by columns, the first column being the primary key."""
+        key = (tuple(columns), ascending)
+        if key not in self._orders:
+            # lexsort sorts by the last key first and is stable
+            order = np.lexsort([self._rank(column, ascending) for column in reversed(columns)])
+            order.flags.writeable = False
+            self._orders[key] = order
+        return self._orders[key]
+
+    def sort_rows(self, columns, ascending=True, rows=None) -> np.ndarray:
+        """
+        :param rows: increasing row positions of a filtered view, None for all rows.
+        :return: positions into the view (or the full frame) in sorted order.
+        """
+        order = self.order(columns, ascending)
+        if rows is None:
+            return order
+        selected = np.zeros(self.size, dtype=bool)
+        selected[rows] = True
+        return np.searchsorted(rows, order[selected[order]])
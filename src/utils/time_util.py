@@ -1,5 +1,6 @@
 from datetime import datetime, timezone
 
+import numpy as np
 import pandas as pd
 from dateutil.relativedelta import relativedelta
 
@@ -65,3 +66,98 @@ def valid_date(date_str: str) -> bool:
     except ValueError:
         log.warning(f"Unable to parse date: {date_str}")
         return False
+
+
+def parse_iso_dates(values) -> pd.Series:
+    """ISO strings to UTC datetimes in one pass, missing or unparsable values become NaT."""
+    values = pd.Series(values, dtype=object)
+    dates = pd.to_datetime(values, utc=True, errors='coerce', format='ISO8601')
+    for value in values[dates.isna() & values.notna()]:
+        log.warning(f"Unable to parse date: {value}")
+    return dates
+
+
+def to_utc_datetime64(dates: pd.Series) -> np.ndarray:
+    return dates.dt.tz_convert('UTC').dt.tz_localize(None).to_numpy(dtype='datetime64[ns]')
+
+
+def round_values(values, digits=2) -> np.ndarray:
+    # np.round differs from round() on halfway values, keep the output of the row wise functions
+    return np.array([round(value, digits) for value in np.asarray(values, dtype=float).tolist()], dtype=float)
+
+
+def _truncate_div(values, divisor):
+    # Division rounding towards zero, like relativedelta normalizes negative differences
+    return np.sign(values) * (np.abs(values) // divisor)
+
+
+def time_until_series(target_times: pd.Series, now=None) -> pd.Series:
+    """
+    time_until for a column of datetimes (parse_iso_dates) at once, the same calendar arithmetic as relativedelta.
+    Missing datetimes give None.
+    """
+    now = now or datetime.now(timezone.utc)
+    now64 = np.datetime64(now.astimezone(timezone.utc).replace(tzinfo=None), 'ns')
+    target = to_utc_datetime64(target_times)
+    valid = ~np.isnat(target)
+
+    now_month = now64.astype('datetime64[M]')
+    time_of_day = now64 - now64.astype('datetime64[D]')
+
+    def add_months(months):
+        # now + months, the day is clipped to the length of the month
+        month = now_month + months.astype('timedelta64[M]')
+        first_day = month.astype('datetime64[D]')
+        days_in_month = ((month + 1).astype('datetime64[D]') - first_day).astype(np.int64)
+        day = np.minimum(now.day, days_in_month)
+        return first_day + (day - 1).astype('timedelta64[D]') + time_of_day
+
+    months = np.where(valid, (target.astype('datetime64[M]') - now_month).astype(np.int64), 0)
+    shifted = add_months(months)
+    past = target < now64
+    while True:
+        # Step towards the target while the shifted date overshoots it
+        step = valid & np.where(past, target > shifted, target < shifted)
+        if not step.any():
+            break
+        months = months + np.where(past, 1, -1) * step
+        shifted = add_months(months)
+
+    seconds = np.where(valid, (target - shifted).astype(np.int64), 0) // 10 ** 9
+    total_minutes = _truncate_div(seconds, 60)
+    total_hours = _truncate_div(total_minutes, 60)
+    days = _truncate_div(total_hours, 24)
+    units = [
+        ('year', _truncate_div(months, 12)),
+        ('month', months - _truncate_div(months, 12) * 12),
+        ('day', days),
+        ('hour', total_hours - days * 24),
+        ('minute', total_minutes - total_hours * 60),
+    ]
+
+    result = np.full(len(target), '', dtype=object)
+    for unit, amounts in units:
+        part = np.where(amounts != 0, amounts.astype(str) + f' {unit}' + np.where(amounts != 1, 's', ''), '')
+        separator = np.where((result != '') & (part != ''), ' ', '')
+        result = result + separator + part
+    result = np.where(result == '', 'now', result)
+    return pd.Series(np.where(valid, result, None), index=target_times.index)
+
+
+def calculate_progress_series(created_dates: pd.Series, end_dates: pd.Series, now=None) -> pd.Series:
+    """calculate_progress for columns of datetimes (parse_iso_dates) at once, NaN when a date is missing."""
+    now = now or datetime.now(timezone.utc)
+    now64 = np.datetime64(now.astimezone(timezone.utc).replace(tzinfo=None), 'ns')
+    start = to_utc_datetime64(created_dates)
+    end = to_utc_datetime64(end_dates)
+    valid = ~np.isnat(start) & ~np.isnat(end)
+
+    # In microseconds, the resolution timedelta.total_seconds works with
+    total_duration = np.where(valid, (end - start).astype(np.int64) // 1000, 1) / 1e6
+    elapsed = np.where(valid, (now64 - start).astype(np.int64) // 1000, 0) / 1e6
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percent = round_values((elapsed / total_duration) * 100)
+
+    percent = np.where(now64 >= end, 100.0, percent)
+    percent = np.where(now64 <= start, 0.0, percent)
+    return pd.Series(np.where(valid, percent, np.nan), index=created_dates.index)